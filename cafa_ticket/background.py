@@ -0,0 +1,38 @@
+"""
+Background task runner
+Small in-process thread pools that run slow side effects after the
+surrounding database transaction commits. Each app keeps its own pool so a
+slow external service can't starve unrelated work.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRunner:
+    """
+    Queue functions on a named thread pool once the current transaction
+    commits. Tasks should take primary keys rather than model instances and
+    reload what they need on the worker thread. Queued work is held in
+    memory, so anything not yet run is lost if the process stops.
+    """
+
+    def __init__(self, name, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    def submit(self, func, *args):
+        """Run func(*args) on the pool after the current transaction commits"""
+        transaction.on_commit(lambda: self._executor.submit(self._run, func, *args))
+
+    @staticmethod
+    def _run(func, *args):
+        try:
+            func(*args)
+        except Exception:
+            logger.exception(f"Background task {func.__name__} failed")
+        finally:
+            # Worker threads get their own DB connections; don't leak them
+            connections.close_all()
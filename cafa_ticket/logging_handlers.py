@@ -0,0 +1,23 @@
+"""
+Logging handlers
+Queue-backed handler so request threads never block on stream I/O
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def queued_stream_handler():
+    """
+    Return a QueueHandler whose records are written to stderr by a
+    QueueListener thread. Calling this starts the thread, so only call it
+    from code that will actually log through the handler. The handler's
+    formatter is applied on the request thread, so the listener just
+    writes the text.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+    return QueueHandler(log_queue)
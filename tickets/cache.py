@@ -0,0 +1,44 @@
+"""
+Cache keys and invalidation helpers for the tickets app.
+Payloads live in the shared cache configured in settings, so an
+invalidation from one worker is seen by all of them.
+"""
+from django.core.cache import cache
+
+
+# ============================================================================
+# DASHBOARDS
+# ============================================================================
+
+DASHBOARD_CACHE_TIMEOUT = 60  # seconds
+
+
+def dashboard_cache_key(user_id, name, *parts):
+    """Cache key for one of a user's dashboard payloads, scoped to the current version"""
+    version = cache.get_or_set(f"dashboard_ver:{user_id}", 1, None)
+    return ":".join(str(part) for part in (name, user_id, *parts, version))
+
+
+def invalidate_dashboard_cache(*user_ids):
+    """Bump the dashboard version so cached stats and revenue payloads are ignored"""
+    for user_id in set(filter(None, user_ids)):
+        try:
+            cache.incr(f"dashboard_ver:{user_id}")
+        except ValueError:
+            # Version key was evicted; stale payloads still expire on their own
+            cache.set(f"dashboard_ver:{user_id}", 1, None)
+
+
+# ============================================================================
+# EVENT CATEGORIES
+# ============================================================================
+
+CATEGORY_LIST_CACHE_KEY = "event_categories:list"
+# Signals invalidate on writes; the short TTL bounds staleness from writes
+# that skip signals (queryset update(), raw SQL)
+CATEGORY_LIST_CACHE_TIMEOUT = 60 * 5  # seconds
+
+
+def invalidate_category_cache():
+    """Drop the cached category list (names or published event counts changed)"""
+    cache.delete(CATEGORY_LIST_CACHE_KEY)
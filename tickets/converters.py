@@ -0,0 +1,18 @@
+"""
+URL Path Converters
+"""
+
+
+class SlugOrIdConverter:
+    """
+    Matches an event slug or numeric ID (Event.slug is a SlugField, max 255).
+    Stricter than <str:>, so non-matching paths are rejected by the resolver
+    without reaching the view.
+    """
+    regex = r'[-a-zA-Z0-9_]{1,255}'
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return str(value)
@@ -8,10 +8,13 @@ from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.core.cache import cache
+from django.db.models import Q, F, Count, Sum, Min, Max, OuterRef, Subquery, IntegerField
+from django.db.models.functions import Coalesce
 from rest_framework import parsers
 
-from .models import Event, EventCategory, TicketType
+from .models import Event, EventCategory, TicketType, Ticket, Purchase
+from .cache import CATEGORY_LIST_CACHE_KEY, CATEGORY_LIST_CACHE_TIMEOUT
 from .new_serializers import (
     EventCategorySerializer,
     EventListSerializer,
@@ -27,6 +30,57 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100
 
 
+def _annotate_event_list(queryset):
+    """
+    Load everything EventListSerializer reads in the list query itself:
+    organizer and category via joins, paid ticket count and price range via
+    subqueries (picked up by the Event properties), instead of 4+ queries per row.
+    """
+    paid_tickets = Ticket.objects.filter(
+        event=OuterRef('pk'), status='paid'
+    ).order_by().values('event').annotate(c=Count('pk')).values('c')
+    ticket_types = TicketType.objects.filter(event=OuterRef('pk')).order_by().values('event')
+
+    return queryset.select_related('organizer', 'category').annotate(
+        paid_ticket_count=Coalesce(Subquery(paid_tickets, output_field=IntegerField()), 0),
+        min_ticket_price=Subquery(ticket_types.annotate(p=Min('price')).values('p')),
+        max_ticket_price=Subquery(ticket_types.annotate(p=Max('price')).values('p')),
+    )
+
+
+def _annotate_event_analytics(queryset):
+    """
+    Per-event figures MyEventsView reports (check-ins, completed revenue and
+    fees, last sale) as subqueries, plus the ticket types in one prefetch,
+    instead of four queries and a ticket type fetch per event.
+    """
+    completed = Purchase.objects.filter(
+        event=OuterRef('pk'), status='completed'
+    ).order_by().values('event')
+    checked_in = Ticket.objects.filter(
+        event=OuterRef('pk'), is_checked_in=True
+    ).order_by().values('event').annotate(c=Count('pk')).values('c')
+
+    return queryset.annotate(
+        checked_in_count=Coalesce(Subquery(checked_in, output_field=IntegerField()), 0),
+        completed_gross=Subquery(completed.annotate(total=Sum('subtotal')).values('total')),
+        completed_fees=Subquery(completed.annotate(total=Sum('service_fee')).values('total')),
+        last_sale_at=Subquery(
+            Purchase.objects.filter(event=OuterRef('pk'), status='completed')
+            .order_by('-created_at').values('created_at')[:1]
+        ),
+    ).prefetch_related('ticket_types')
+
+
+def _owned_ticket_types(slug_or_id, user):
+    """Ticket types of one of the user's events, with the event joined in the same query"""
+    if slug_or_id.isdigit():
+        event_lookup = {'event_id': int(slug_or_id)}
+    else:
+        event_lookup = {'event__slug': slug_or_id}
+    return TicketType.objects.select_related('event').filter(event__organizer=user, **event_lookup)
+
+
 class EventCategoryListView(generics.ListAPIView):
     """
     GET /api/v1/event-categories/
@@ -35,13 +89,18 @@ class EventCategoryListView(generics.ListAPIView):
     serializer_class = EventCategorySerializer
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        # Categories barely change; serve the payload from the shared cache
+        # and let the category/event signals drop it on writes
+        payload = cache.get(CATEGORY_LIST_CACHE_KEY)
+        if payload is None:
+            categories = self.get_serializer(self.get_queryset(), many=True).data
+            payload = {
+                'count': len(categories),
+                'categories': categories
+            }
+            cache.set(CATEGORY_LIST_CACHE_KEY, payload, CATEGORY_LIST_CACHE_TIMEOUT)
 
-        return Response({
-            'count': queryset.count(),
-            'categories': serializer.data
-        })
+        return Response(payload)
 
 
 class EventListView(generics.ListAPIView):
@@ -55,37 +114,51 @@ class EventListView(generics.ListAPIView):
     ordering_fields = ['start_date', 'created_at', '-start_date', '-created_at']
 
     def get_queryset(self):
-        queryset = Event.objects.filter(is_published=True)
+        # Event-level conditions are collected into one Q and applied once,
+        # rather than cloning the queryset for every parameter
+        q = Q(is_published=True)
 
         # Filter by status (default: upcoming)
         event_status = self.request.query_params.get('status', 'upcoming')
         now = timezone.now().date()
 
         if event_status == 'upcoming':
-            queryset = queryset.filter(start_date__gt=now)
+            q &= Q(start_date__gt=now)
         elif event_status == 'ongoing':
-            queryset = queryset.filter(start_date__lte=now, end_date__gte=now)
+            q &= Q(start_date__lte=now, end_date__gte=now)
         elif event_status == 'all':
-            queryset = queryset.filter(Q(start_date__gte=now) | Q(start_date__lte=now, end_date__gte=now))
+            q &= Q(start_date__gte=now) | Q(start_date__lte=now, end_date__gte=now)
 
         # Filter by category
         category = self.request.query_params.get('category')
         if category:
-            queryset = queryset.filter(category__slug=category)
+            q &= Q(category__slug=category)
 
         # Filter by city
         city = self.request.query_params.get('city')
         if city:
-            queryset = queryset.filter(venue_city__iexact=city)
+            q &= Q(venue_city__iexact=city)
 
         # Date range filters
         date_from = self.request.query_params.get('date_from')
         if date_from:
-            queryset = queryset.filter(start_date__gte=date_from)
+            q &= Q(start_date__gte=date_from)
 
         date_to = self.request.query_params.get('date_to')
         if date_to:
-            queryset = queryset.filter(start_date__lte=date_to)
+            q &= Q(start_date__lte=date_to)
+
+        # Search
+        search = self.request.query_params.get('search')
+        if search:
+            q &= (
+                Q(title__icontains=search) |
+                Q(description__icontains=search) |
+                Q(venue_name__icontains=search) |
+                Q(venue_city__icontains=search)
+            )
+
+        queryset = Event.objects.filter(q)
 
         # Price range filters
         price_min = self.request.query_params.get('price_min')
@@ -100,16 +173,6 @@ class EventListView(generics.ListAPIView):
                 ticket_filter &= Q(ticket_types__price__lte=price_max)
             queryset = queryset.filter(ticket_filter).distinct()
 
-        # Search
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(venue_name__icontains=search) |
-                Q(venue_city__icontains=search)
-            )
-
         # Ordering
         ordering = self.request.query_params.get('ordering', '-start_date')
 
@@ -125,8 +188,13 @@ class EventListView(generics.ListAPIView):
 
         if ordering in ordering_map:
             queryset = queryset.order_by(ordering_map[ordering])
+            # Ordering by price joins ticket types; fold the repeated rows
+            if ordering_map[ordering].lstrip('-').startswith('ticket_types__'):
+                queryset = queryset.distinct()
 
-        return queryset.distinct()
+        # Every other filter touches Event columns only, so rows cannot
+        # repeat and a DISTINCT sort would be pure overhead
+        return _annotate_event_list(queryset)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
@@ -146,10 +214,11 @@ class EventListView(generics.ListAPIView):
             result.data['filters_applied'] = filters_applied
             return result
 
-        serializer = self.get_serializer(queryset, many=True)
+        # Evaluate once; the count comes from the fetched rows
+        results = self.get_serializer(list(queryset), many=True).data
         return Response({
-            'count': queryset.count(),
-            'results': serializer.data,
+            'count': len(results),
+            'results': results,
             'filters_applied': filters_applied
         })
 
@@ -185,7 +254,7 @@ class PastEventsListView(generics.ListAPIView):
                 Q(venue_name__icontains=search)
             )
 
-        return queryset.order_by('-end_date')
+        return _annotate_event_list(queryset.order_by('-end_date'))
 
 
 class EventDetailView(generics.RetrieveAPIView):
@@ -212,9 +281,10 @@ class EventDetailView(generics.RetrieveAPIView):
             except (Event.DoesNotExist, ValueError):
                 raise Event.DoesNotExist
 
-        # Increment view count
+        # Increment view count in SQL: no read-modify-write race, and no
+        # post_save signal (which would flush the organizer's caches)
+        Event.objects.filter(pk=obj.pk).update(views_count=F('views_count') + 1)
         obj.views_count += 1
-        obj.save(update_fields=['views_count'])
 
         return obj
 
@@ -406,14 +476,15 @@ class MyEventsView(generics.ListAPIView):
 
         # Filter by status
         event_status = self.request.query_params.get('status', 'all')
-        now = timezone.now().date()
+        if event_status in ('upcoming', 'ongoing', 'past'):
+            now = timezone.now().date()
 
-        if event_status == 'upcoming':
-            queryset = queryset.filter(start_date__gt=now)
-        elif event_status == 'ongoing':
-            queryset = queryset.filter(start_date__lte=now, end_date__gte=now)
-        elif event_status == 'past':
-            queryset = queryset.filter(end_date__lt=now)
+            if event_status == 'upcoming':
+                queryset = queryset.filter(start_date__gt=now)
+            elif event_status == 'ongoing':
+                queryset = queryset.filter(start_date__lte=now, end_date__gte=now)
+            else:
+                queryset = queryset.filter(end_date__lt=now)
 
         # Filter by published status
         is_published = self.request.query_params.get('is_published')
@@ -460,7 +531,7 @@ class MyEventsView(generics.ListAPIView):
 
         # Apply sorting
         ordering = sort_map.get(sort_by, '-start_date')  # Default to -start_date
-        return queryset.order_by(ordering)
+        return _annotate_event_list(queryset.order_by(ordering))
 
     def list(self, request, *args, **kwargs):
         from django.db.models import Sum, Count, Q
@@ -492,27 +563,26 @@ class MyEventsView(generics.ListAPIView):
         }
 
         # Paginate
+        queryset = _annotate_event_analytics(queryset)
         page = self.paginate_queryset(queryset)
         events_to_process = page if page is not None else queryset
 
         # Build results with analytics and ticket types
         results = []
+        serializer_context = self.get_serializer_context()
         for event in events_to_process:
             # Use serializer for basic event data
-            event_data = EventListSerializer(event, context={'request': request}).data
+            event_data = EventListSerializer(event, context=serializer_context).data
             
             # Add analytics
-            tickets_sold = event.tickets.filter(status='paid').count()
-            tickets_checked_in = event.tickets.filter(is_checked_in=True).count()
+            tickets_sold = event.tickets_sold
+            tickets_checked_in = event.checked_in_count
             total_tickets = event.max_attendees
             
-            event_purchases = Purchase.objects.filter(event=event, status='completed')
-            gross_revenue = event_purchases.aggregate(total=Sum('subtotal'))['total'] or 0
-            platform_fee = event_purchases.aggregate(total=Sum('service_fee'))['total'] or 0
+            gross_revenue = event.completed_gross or 0
+            platform_fee = event.completed_fees or 0
             net_revenue = gross_revenue
             
-            last_sale = event_purchases.order_by('-created_at').first()
-            
             event_data['analytics'] = {
                 'total_tickets': total_tickets,
                 'tickets_sold': tickets_sold,
@@ -525,7 +595,7 @@ class MyEventsView(generics.ListAPIView):
                 'page_views': event.views_count,
                 'unique_visitors': event.views_count,
                 'conversion_rate': round((tickets_sold / event.views_count * 100) if event.views_count > 0 else 0, 2),
-                'last_sale_date': last_sale.created_at if last_sale else None,
+                'last_sale_date': event.last_sale_at,
             }
             
             # Add ticket types
@@ -701,6 +771,7 @@ class MyEventDetailView(generics.RetrieveAPIView):
 
         # Ticket types with analytics
         ticket_types_data = []
+        now = timezone.now()
         for tt in instance.ticket_types.all():
             tickets_sold = tt.tickets_sold
             revenue = tickets_sold * tt.price
@@ -720,7 +791,7 @@ class MyEventDetailView(generics.RetrieveAPIView):
                 'max_purchase': tt.max_purchase,
                 'available_from': tt.available_from,
                 'available_until': tt.available_until,
-                'status': 'expired' if (tt.available_until and timezone.now() > tt.available_until) else ('active' if tt.is_available else 'inactive')
+                'status': 'expired' if (tt.available_until and now > tt.available_until) else ('active' if tt.is_available else 'inactive')
             })
 
         response_data = {
@@ -775,14 +846,7 @@ class UpdateTicketTypeView(generics.UpdateAPIView):
 
     def get_queryset(self):
         # Only allow updating tickets for events owned by the user
-        slug_or_id = self.kwargs.get('slug_or_id')
-        
-        if slug_or_id.isdigit():
-            event = get_object_or_404(Event, id=int(slug_or_id), organizer=self.request.user)
-        else:
-            event = get_object_or_404(Event, slug=slug_or_id, organizer=self.request.user)
-        
-        return TicketType.objects.filter(event=event)
+        return _owned_ticket_types(self.kwargs.get('slug_or_id'), self.request.user)
     
     def get_object(self):
         """Get ticket by ID"""
@@ -820,14 +884,7 @@ class DeleteTicketTypeView(generics.DestroyAPIView):
 
     def get_queryset(self):
         # Only allow deleting tickets for events owned by the user
-        slug_or_id = self.kwargs.get('slug_or_id')
-        
-        if slug_or_id.isdigit():
-            event = get_object_or_404(Event, id=int(slug_or_id), organizer=self.request.user)
-        else:
-            event = get_object_or_404(Event, slug=slug_or_id, organizer=self.request.user)
-        
-        return TicketType.objects.filter(event=event)
+        return _owned_ticket_types(self.kwargs.get('slug_or_id'), self.request.user)
     
     def get_object(self):
         """Get ticket by ID"""
@@ -0,0 +1,16 @@
+"""
+Django management command to release organizer revenue past its holding period
+Run with: python manage.py release_pending_revenue
+Schedule every 5 minutes, e.g. cron: */5 * * * * python manage.py release_pending_revenue
+"""
+
+from django.core.management.base import BaseCommand
+from tickets.models import OrganizerRevenue
+
+
+class Command(BaseCommand):
+    help = 'Mark pending organizer revenue as available once the 7-day hold has passed'
+
+    def handle(self, *args, **options):
+        released = OrganizerRevenue.release_pending()
+        self.stdout.write(self.style.SUCCESS(f'Released {released} revenue record(s)'))
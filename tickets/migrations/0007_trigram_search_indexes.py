@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = [
+    ('idx_ticket_id_trgm', 'tickets_ticket', 'ticket_id'),
+    ('idx_ticket_attendee_name_trgm', 'tickets_ticket', 'attendee_name'),
+    ('idx_ticket_attendee_email_trgm', 'tickets_ticket', 'attendee_email'),
+    ('idx_ticket_attendee_phone_trgm', 'tickets_ticket', 'attendee_phone'),
+    ('idx_event_title_trgm', 'tickets_event', 'title'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm GIN indexes let Postgres serve ILIKE '%term%' from an index.
+    # Other backends (sqlite in development) keep the plain B-tree indexes.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table, _column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_ticket_price_withdrawalrequest_organizerrevenue_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_ticket_idx_ticket_event_created_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['purchase', 'status', 'event', 'ticket_type'], name='idx_ticket_purchase_cover'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['event', 'status', 'created_at'], name='idx_purchase_event_month'),
+        ),
+    ]
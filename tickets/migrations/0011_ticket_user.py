@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_ticket_user(apps, schema_editor):
+    Ticket = apps.get_model('tickets', 'Ticket')
+    Purchase = apps.get_model('tickets', 'Purchase')
+    Ticket.objects.filter(user__isnull=True).update(
+        user_id=models.Subquery(
+            Purchase.objects.filter(pk=models.OuterRef('purchase_id')).values('user_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_dashboard_covering_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='user',
+            field=models.ForeignKey(blank=True, help_text='Buyer (denormalized from purchase.user for user-scoped lookups)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='owned_tickets', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(populate_ticket_user, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['user', '-created_at'], name='idx_ticket_user_created'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_ticket_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organizerrevenue',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['status', 'available_at'], name='idx_revenue_pending_release'),
+        ),
+        migrations.AddIndex(
+            model_name='organizerrevenue',
+            index=models.Index(fields=['organizer', 'status', 'is_withdrawn'], name='idx_revenue_balances'),
+        ),
+    ]
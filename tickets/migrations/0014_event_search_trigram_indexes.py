@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = [
+    ('idx_event_description_trgm', 'tickets_event', 'description'),
+    ('idx_event_venue_name_trgm', 'tickets_event', 'venue_name'),
+    ('idx_event_venue_city_trgm', 'tickets_event', 'venue_city'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Together with idx_event_title_trgm (0007) every column of the event
+    # search OR-chain has a pg_trgm index, so Postgres can BitmapOr them
+    # instead of scanning the table. Other backends are left untouched.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table, _column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0013_purchase_idx_purchase_event_subtotal'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
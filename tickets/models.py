@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Sum
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -7,6 +8,8 @@ import uuid
 from decimal import Decimal
 from datetime import timedelta
 
+from .utils import generate_ticket_qr_code
+
 User = get_user_model()
 
 
@@ -241,6 +244,17 @@ class Event(models.Model):
             models.Index(fields=["organizer"], name="idx_event_organizer_v2"),
             models.Index(fields=["is_published"], name="idx_event_published"),
             models.Index(fields=["venue_city"], name="idx_event_city"),
+            # Public listings only ever touch published events
+            models.Index(
+                fields=["-start_date"],
+                condition=models.Q(is_published=True),
+                name="idx_event_published_start",
+            ),
+            models.Index(
+                fields=["category", "-start_date"],
+                condition=models.Q(is_published=True),
+                name="idx_event_published_category",
+            ),
         ]
 
     def __str__(self):
@@ -295,6 +309,9 @@ class Event(models.Model):
     @property
     def tickets_sold(self):
         """Count of tickets that are paid"""
+        # List querysets annotate this up front to avoid a COUNT per event
+        if hasattr(self, "paid_ticket_count"):
+            return self.paid_ticket_count
         return self.tickets.filter(status="paid").count()
 
     @property
@@ -308,19 +325,22 @@ class Event(models.Model):
     @property
     def lowest_price(self):
         """Get lowest ticket price"""
+        if hasattr(self, "min_ticket_price"):
+            return self.min_ticket_price if self.min_ticket_price is not None else Decimal("0.00")
         ticket_type = self.ticket_types.order_by("price").first()
         return ticket_type.price if ticket_type else Decimal("0.00")
 
     @property
     def highest_price(self):
         """Get highest ticket price"""
+        if hasattr(self, "max_ticket_price"):
+            return self.max_ticket_price if self.max_ticket_price is not None else Decimal("0.00")
         ticket_type = self.ticket_types.order_by("-price").first()
         return ticket_type.price if ticket_type else Decimal("0.00")
 
     @property
     def revenue_generated(self):
         """Calculate total revenue generated from ticket sales"""
-        from django.db.models import Sum
         total = Purchase.objects.filter(
             event=self,
             status="completed"
@@ -525,6 +545,10 @@ class Purchase(models.Model):
             models.Index(fields=["purchase_id"], name="idx_purchase_id"),
             models.Index(fields=["user"], name="idx_purchase_user"),
             models.Index(fields=["status"], name="idx_purchase_status"),
+            # Covers organizer revenue-by-month aggregates
+            models.Index(fields=["event", "status", "created_at"], name="idx_purchase_event_month"),
+            # Covers per-event gross revenue sums (top events by revenue)
+            models.Index(fields=["event", "status", "subtotal"], name="idx_purchase_event_subtotal"),
         ]
 
     def __str__(self):
@@ -540,24 +564,28 @@ class Purchase(models.Model):
 
         # Track if this is a status change to completed
         is_new_completion = False
+        user_changed = False
         if self.pk:
             try:
                 old_purchase = Purchase.objects.get(pk=self.pk)
                 if old_purchase.status != "completed" and self.status == "completed":
                     is_new_completion = True
+                user_changed = old_purchase.user_id != self.user_id
             except Purchase.DoesNotExist:
                 pass
 
         super().save(*args, **kwargs)
 
+        # Keep the denormalized ticket owner in sync
+        if user_changed:
+            self.tickets.update(user_id=self.user_id)
+
         # Create revenue record when purchase is completed
         if is_new_completion:
             self._create_revenue_record()
 
     def _create_revenue_record(self):
         """Create revenue record for the organizer when purchase is completed"""
-        from decimal import Decimal
-        
         # Calculate platform commission (5%)
         platform_commission_rate = Decimal('0.05')  # 5%
         platform_fee = self.subtotal * platform_commission_rate
@@ -697,6 +725,14 @@ class Ticket(models.Model):
         related_name="tickets",
         help_text="Associated purchase"
     )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="owned_tickets",
+        help_text="Buyer (denormalized from purchase.user for user-scoped lookups)"
+    )
     event = models.ForeignKey(
         Event,
         on_delete=models.CASCADE,
@@ -779,14 +815,24 @@ class Ticket(models.Model):
             models.Index(fields=["event"], name="idx_ticket_event_v2"),
             models.Index(fields=["status"], name="idx_ticket_status_v2"),
             models.Index(fields=["purchase"], name="idx_ticket_purchase"),
+            models.Index(fields=["event", "-created_at", "id"], name="idx_ticket_event_created_id"),
+            # Covers the per-buyer category breakdown on the dashboard stats
+            models.Index(fields=["purchase", "status", "event", "ticket_type"], name="idx_ticket_purchase_cover"),
+            models.Index(fields=["user", "-created_at"], name="idx_ticket_user_created"),
         ]
 
     def __str__(self):
         return f"Ticket {self.ticket_id} - {self.attendee_name}"
 
+    @staticmethod
+    def generate_ticket_id():
+        return f"TKT-{uuid.uuid4().hex.upper()}"
+
     def save(self, *args, **kwargs):
         if not self.ticket_id:
-            self.ticket_id = f"TKT-{uuid.uuid4().hex.upper()}"
+            self.ticket_id = self.generate_ticket_id()
+        if self.user_id is None and self.purchase_id:
+            self.user_id = self.purchase.user_id
         super().save(*args, **kwargs)
 
     @property
@@ -810,40 +856,9 @@ class Ticket(models.Model):
 
     def generate_qr_code(self):
         """Generate QR code for ticket"""
-        import qrcode
-        from io import BytesIO
-        from django.core.files import File
-        import json
-        
-        # Create QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        
-        # QR code contains ticket information
-        qr_data = {
-            'ticket_id': self.ticket_id,
-            'event_id': str(self.event.id),
-            'attendee_name': self.attendee_name,
-        }
-        
-        qr.add_data(json.dumps(qr_data))
-        qr.make(fit=True)
-        
-        # Create image
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Save to BytesIO
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
         # Save to model
-        filename = f"ticket_{self.ticket_id}.png"
-        self.qr_code.save(filename, File(buffer), save=True)
+        qr_code_file = generate_ticket_qr_code(self)
+        self.qr_code.save(qr_code_file.name, qr_code_file, save=True)
         
         return self.qr_code
 
@@ -1145,6 +1160,14 @@ class OrganizerRevenue(models.Model):
             models.Index(fields=['event'], name='idx_revenue_event'),
             models.Index(fields=['status'], name='idx_revenue_status'),
             models.Index(fields=['is_withdrawn'], name='idx_revenue_withdrawn'),
+            # Pending -> available release only ever scans pending rows
+            models.Index(
+                fields=['status', 'available_at'],
+                name='idx_revenue_pending_release',
+                condition=models.Q(status='pending'),
+            ),
+            # Balance aggregates on the revenue dashboard
+            models.Index(fields=['organizer', 'status', 'is_withdrawn'], name='idx_revenue_balances'),
         ]
     
     def __str__(self):
@@ -1153,10 +1176,17 @@ class OrganizerRevenue(models.Model):
     def save(self, *args, **kwargs):
         # Set available_at to 7 days from creation (configurable)
         if not self.available_at:
-            from datetime import timedelta
             self.available_at = timezone.now() + timedelta(days=7)
         super().save(*args, **kwargs)
 
+    @classmethod
+    def release_pending(cls, organizer=None):
+        """Mark revenue past its 7-day holding period as available"""
+        queryset = cls.objects.filter(status='pending', available_at__lte=timezone.now())
+        if organizer is not None:
+            queryset = queryset.filter(organizer=organizer)
+        return queryset.update(status='available')
+
 
 class WithdrawalRequest(models.Model):
     """Withdrawal requests from organizers"""
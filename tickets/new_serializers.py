@@ -38,10 +38,15 @@ class EventCategorySerializer(serializers.ModelSerializer):
             'icon',
             'event_count',
         ]
+        read_only_fields = fields
 
     def get_event_count(self, obj):
         """Get count of published events in this category"""
-        return obj.events.filter(is_published=True).count()
+        # Event lists repeat the same few categories; count each once per request
+        counts = self.context.setdefault('category_event_counts', {})
+        if obj.pk not in counts:
+            counts[obj.pk] = obj.events.filter(is_published=True).count()
+        return counts[obj.pk]
 
 
 # ============================================================================
@@ -53,6 +58,7 @@ class OrganizerSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'full_name', 'profile_image']
+        read_only_fields = fields
 
 
 class OrganizerDetailSerializer(serializers.ModelSerializer):
@@ -74,6 +80,7 @@ class OrganizerDetailSerializer(serializers.ModelSerializer):
             'total_tickets_sold',
             'member_since',
         ]
+        read_only_fields = fields
 
     def get_events_organized(self, obj):
         return obj.organized_events.filter(is_published=True).count()
@@ -111,6 +118,7 @@ class TicketTypeSerializer(serializers.ModelSerializer):
             'is_available',
             'sold_out_at',
         ]
+        read_only_fields = fields
 
 
 class TicketTypeCreateSerializer(serializers.ModelSerializer):
@@ -197,6 +205,7 @@ class EventListSerializer(serializers.ModelSerializer):
             'is_published',
             'updated_at', 
         ]
+        read_only_fields = fields
 
 
 # ============================================================================
@@ -252,6 +261,7 @@ class EventDetailSerializer(serializers.ModelSerializer):
             'similar_events',
             'share_urls',
         ]
+        read_only_fields = fields
 
     def get_venue(self, obj):
         """Format venue information"""
@@ -5,15 +5,16 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from decimal import Decimal
 import requests
+import traceback
 import uuid
 
-from .models import Purchase, Payment, Ticket, TicketType, Event
-from .serializers import TicketSerializer
+from .models import Purchase, Payment, Ticket, TicketType, Event, OrganizerRevenue
+from .utils import paystack_session, PAYSTACK_TIMEOUT
+from .tasks import run_in_background, send_purchase_ticket_email_task
 
 
 @api_view(['POST'])
@@ -211,7 +212,8 @@ def verify_payment(request, reference):
     
     URL: /payments/verify/{reference}/
     """
-    import traceback
+    # Legacy serializer module; imported here so URL loading doesn't pull it in
+    from .serializers import TicketSerializer
     
     try:
         print(f"\n{'='*50}")
@@ -356,12 +358,10 @@ def verify_payment(request, reference):
             
             # Create revenue record for organizer
             print("Creating revenue record...")
-            from decimal import Decimal
             platform_commission_rate = Decimal('0.05')  # 5%
             platform_fee = purchase.subtotal * platform_commission_rate
             organizer_earnings = purchase.subtotal - platform_fee
             
-            from .models import OrganizerRevenue
             OrganizerRevenue.objects.create(
                 organizer=purchase.event.organizer,
                 event=purchase.event,
@@ -373,15 +373,9 @@ def verify_payment(request, reference):
             )
             print("✅ Revenue record created")
             
-            # Send ticket confirmation email
-            print("Sending confirmation email...")
-            try:
-                from .utils import send_purchase_ticket_email
-                send_purchase_ticket_email(purchase)
-                print("✅ Email sent successfully")
-            except Exception as e:
-                print(f"⚠️ Failed to send email: {str(e)}")
-                # Don't fail the whole transaction if email fails
+            # Queue ticket confirmation email; it is sent after commit, off the request thread
+            run_in_background(send_purchase_ticket_email_task, purchase.pk)
+            print("✅ Confirmation email queued")
         
         # Serialize tickets
         print("Serializing tickets for response...")
@@ -439,11 +433,6 @@ def initialize_paystack_payment(email, amount, reference, metadata=None):
     
     url = "https://api.paystack.co/transaction/initialize"
     
-    headers = {
-        "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json"
-    }
-    
     payload = {
         "email": email,
         "amount": amount_in_pesewas,
@@ -454,7 +443,7 @@ def initialize_paystack_payment(email, amount, reference, metadata=None):
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        response = paystack_session.post(url, json=payload, timeout=PAYSTACK_TIMEOUT)
         response_data = response.json()
         
         if response.status_code == 200 and response_data.get('status'):
@@ -492,13 +481,8 @@ def verify_paystack_payment(reference):
     """
     url = f"https://api.paystack.co/transaction/verify/{reference}"
     
-    headers = {
-        "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json"
-    }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = paystack_session.get(url, timeout=PAYSTACK_TIMEOUT)
         response_data = response.json()
         
         if response.status_code == 200 and response_data.get('status'):
@@ -9,6 +9,7 @@ from datetime import timedelta
 
 from .models import Purchase, Payment, Ticket, Event, TicketType
 from .new_serializers import EventListSerializer, TicketTypeSerializer
+from .utils import parse_ticket_qr_payload
 
 
 # ============================================================================
@@ -152,6 +153,7 @@ class TicketSerializer(serializers.ModelSerializer):
             'is_checked_in',
             'checked_in_at',
         ]
+        read_only_fields = fields
 
     def get_event(self, obj):
         """Return event info in expected format"""
@@ -223,6 +225,7 @@ class TicketDetailSerializer(serializers.ModelSerializer):
             'is_checked_in',
             'checked_in_at',
         ]
+        read_only_fields = fields
 
     def get_event(self, obj):
         """Return detailed event info"""
@@ -292,6 +295,40 @@ class TicketDetailSerializer(serializers.ModelSerializer):
         }
     
 
+class AttendedEventSerializer(serializers.ModelSerializer):
+    """Compact event info for the attended-events list"""
+    featured_image = serializers.SerializerMethodField()
+    category = serializers.CharField(source='category.name', read_only=True, allow_null=True)
+    event_date = serializers.DateField(source='start_date', read_only=True)
+
+    class Meta:
+        model = Event
+        fields = ['id', 'title', 'slug', 'featured_image', 'category', 'venue_name', 'event_date']
+        read_only_fields = fields
+
+    def get_featured_image(self, obj):
+        """Prefix the media URL with the host resolved once by the view"""
+        if not obj.featured_image:
+            return None
+        return self.context.get('base_url', '') + obj.featured_image.url
+
+
+class AttendedTicketSerializer(serializers.ModelSerializer):
+    """Serializer for tickets the user has checked in with"""
+    event = AttendedEventSerializer(read_only=True)
+    ticket_type = serializers.CharField(source='ticket_type.name', read_only=True, allow_null=True)
+    attended_date = serializers.DateTimeField(source='checked_in_at', read_only=True)
+    amount_paid = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Ticket
+        fields = ['event', 'ticket_id', 'ticket_type', 'attended_date', 'amount_paid']
+        read_only_fields = fields
+
+    def get_amount_paid(self, obj):
+        return str(obj.ticket_type.price) if obj.ticket_type else '0.00'
+
+
 # ============================================================================
 # PAYMENT SERIALIZERS
 # ============================================================================
@@ -327,7 +364,8 @@ class CheckInSerializer(serializers.Serializer):
     ticket_id = serializers.CharField(required=True)
 
     def validate_ticket_id(self, value):
-        """Validate ticket exists"""
+        """Validate ticket exists; accepts a raw scanned QR payload too"""
+        value = parse_ticket_qr_payload(value)
         try:
             Ticket.objects.get(ticket_id=value)
         except Ticket.DoesNotExist:
@@ -5,15 +5,19 @@ Handles ticket purchase flow with Paystack integration
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from decimal import Decimal
-import requests
 import hmac
 import hashlib
 
 from .models import Purchase, Payment, Ticket, Event, TicketType
+from .utils import paystack_session, PAYSTACK_TIMEOUT, generate_ticket_qr_code
 from .purchase_serializers import (
     PurchaseInitiateSerializer,
     PaymentStatusSerializer,
@@ -61,19 +65,24 @@ class InitiatePurchaseView(APIView):
             status='reserved'
         )
 
-        # Create tickets in reserved state
-        tickets = []
-        for i in range(quantity):
-            ticket = Ticket.objects.create(
-                purchase=purchase,
-                event=event,
-                ticket_type=ticket_type,
-                attendee_name=attendee_info['name'],
-                attendee_email=attendee_info['email'],
-                attendee_phone=attendee_info['phone'],
-                status='reserved'
-            )
-            tickets.append(ticket)
+        # Create tickets in reserved state with a single INSERT
+        # (bulk_create skips Ticket.save(), so fill its defaults here).
+        # Every seat shares the same fields; only the ticket ID varies.
+        ticket_fields = {
+            'purchase': purchase,
+            'user': request.user,
+            'event': event,
+            'ticket_type': ticket_type,
+            'attendee_name': attendee_info['name'],
+            'attendee_email': attendee_info['email'],
+            'attendee_phone': attendee_info['phone'],
+            'status': 'reserved',
+        }
+        generate_ticket_id = Ticket.generate_ticket_id
+        tickets = Ticket.objects.bulk_create([
+            Ticket(ticket_id=generate_ticket_id(), **ticket_fields)
+            for _ in range(quantity)
+        ])
 
         # Initialize Paystack payment
         paystack_response = self._initialize_paystack_payment(
@@ -84,9 +93,7 @@ class InitiatePurchaseView(APIView):
             # Rollback purchase
             purchase.status = 'failed'
             purchase.save()
-            for ticket in tickets:
-                ticket.status = 'expired'
-                ticket.save()
+            purchase.tickets.update(status='expired', updated_at=timezone.now())
 
             return Response({
                 'error': 'Payment initialization failed',
@@ -165,11 +172,6 @@ class InitiatePurchaseView(APIView):
                 }
 
             url = 'https://api.paystack.co/transaction/initialize'
-            headers = {
-                'Authorization': f'Bearer {paystack_secret}',
-                'Content-Type': 'application/json'
-            }
-
             # Convert to kobo (GHS to pesewas)
             amount_in_pesewas = int(purchase.total * 100)
 
@@ -188,7 +190,7 @@ class InitiatePurchaseView(APIView):
                 }
             }
 
-            response = requests.post(url, json=data, headers=headers)
+            response = paystack_session.post(url, json=data, timeout=PAYSTACK_TIMEOUT)
             response_data = response.json()
 
             if response.status_code == 200 and response_data.get('status'):
@@ -215,6 +217,8 @@ class PaymentWebhookView(APIView):
     """
     POST /api/v1/payments/webhook/
     Paystack webhook endpoint
+    Replies with plain JsonResponse: the caller is Paystack, so DRF content
+    negotiation and renderers add nothing here.
     """
     permission_classes = []  # Public endpoint, validated by signature
 
@@ -222,7 +226,7 @@ class PaymentWebhookView(APIView):
         # Verify Paystack signature
         paystack_signature = request.headers.get('X-Paystack-Signature')
         if not self._verify_signature(request.body, paystack_signature):
-            return Response({'error': 'Invalid signature'}, status=status.HTTP_400_BAD_REQUEST)
+            return JsonResponse({'error': 'Invalid signature'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Get event data
         event_data = request.data
@@ -231,7 +235,7 @@ class PaymentWebhookView(APIView):
         if event_type == 'charge.success':
             return self._handle_successful_payment(event_data['data'])
 
-        return Response({'message': 'Webhook received'})
+        return JsonResponse({'message': 'Webhook received'})
 
     def _verify_signature(self, payload, signature):
         """Verify Paystack webhook signature"""
@@ -251,42 +255,45 @@ class PaymentWebhookView(APIView):
         purchase_id = metadata.get('purchase_id')
 
         if not purchase_id:
-            return Response({'error': 'Invalid metadata'}, status=status.HTTP_400_BAD_REQUEST)
+            return JsonResponse({'error': 'Invalid metadata'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # Get purchase and payment
             purchase = Purchase.objects.get(purchase_id=purchase_id)
-            payment = Payment.objects.get(purchase=purchase)
 
-            # Update payment status
-            payment.status = 'completed'
-            payment.completed_at = timezone.now()
-            payment.provider_response = payment_data
-            payment.save()
+            # Update payment status (only the columns that change)
+            Payment.objects.filter(purchase=purchase).update(
+                status='completed',
+                completed_at=timezone.now(),
+                provider_response=payment_data,
+            )
 
             # Update purchase status
             purchase.status = 'completed'
             purchase.completed_at = timezone.now()
             purchase.save()
 
-            # Update tickets to paid and generate QR codes
-            from .utils import generate_ticket_qr_code
-            for ticket in purchase.tickets.all():
+            # Update tickets to paid and generate QR codes; the files are
+            # stored per ticket but the rows go back in one UPDATE
+            tickets = list(purchase.tickets.all())
+            now = timezone.now()
+            for ticket in tickets:
                 ticket.status = 'paid'
+                ticket.updated_at = now
                 qr_code_file = generate_ticket_qr_code(ticket)
                 ticket.qr_code.save(qr_code_file.name, qr_code_file, save=False)
-                ticket.save()
+            Ticket.objects.bulk_update(tickets, ['status', 'qr_code', 'updated_at'])
 
             # Update ticket type sold count
-            purchase.ticket_type.tickets_sold += purchase.quantity
-            purchase.ticket_type.save()
+            TicketType.objects.filter(pk=purchase.ticket_type_id).update(
+                tickets_sold=F('tickets_sold') + purchase.quantity
+            )
 
             # TODO: Send confirmation email with tickets
 
-            return Response({'message': 'Webhook processed successfully'})
+            return JsonResponse({'message': 'Webhook processed successfully'})
 
         except Purchase.DoesNotExist:
-            return Response({'error': 'Purchase not found'}, status=status.HTTP_404_NOT_FOUND)
+            return JsonResponse({'error': 'Purchase not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
 class PaymentStatusView(APIView):
@@ -298,7 +305,7 @@ class PaymentStatusView(APIView):
 
     def get(self, request, payment_id):
         payment = get_object_or_404(
-            Payment,
+            Payment.objects.select_related('purchase', 'purchase__event'),
             payment_id=payment_id,
             purchase__user=request.user
         )
@@ -333,7 +340,7 @@ class PaymentStatusView(APIView):
                         'qr_code_url': request.build_absolute_uri(ticket.qr_code.url) if ticket.qr_code else None,
                         'download_url': f'/api/v1/tickets/{ticket.ticket_id}/download/'
                     }
-                    for ticket in payment.purchase.tickets.all()
+                    for ticket in payment.purchase.tickets.select_related('ticket_type')
                 ],
                 'receipt': {
                     'subtotal': str(payment.purchase.subtotal),
@@ -392,22 +399,21 @@ class CancelPurchaseView(APIView):
                 'status': purchase.status
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Cancel purchase
-        purchase.status = 'expired'
-        purchase.save()
+        with transaction.atomic():
+            # Cancel purchase
+            purchase.status = 'expired'
+            purchase.save()
 
-        # Update tickets to expired
-        tickets_released = 0
-        for ticket in purchase.tickets.all():
-            if ticket.status in ['reserved', 'pending']:
-                ticket.status = 'expired'
-                ticket.save()
-                tickets_released += 1
+            # Expire outstanding tickets in one UPDATE
+            tickets_released = purchase.tickets.filter(
+                status__in=['reserved', 'pending']
+            ).update(status='expired', updated_at=timezone.now())
 
-        # Release ticket type count
-        if tickets_released > 0:
-            purchase.ticket_type.tickets_sold = max(0, purchase.ticket_type.tickets_sold - tickets_released)
-            purchase.ticket_type.save()
+            # Release ticket type count atomically in the database
+            if tickets_released > 0:
+                TicketType.objects.filter(pk=purchase.ticket_type_id).update(
+                    tickets_sold=Greatest(F('tickets_sold') - tickets_released, 0)
+                )
 
         return Response({
             'message': 'Purchase cancelled successfully. Tickets have been released.',
@@ -539,7 +545,7 @@ class PaymentDetailView(APIView):
 
     def get(self, request, payment_id):
         payment = get_object_or_404(
-            Payment,
+            Payment.objects.select_related('purchase', 'purchase__event', 'purchase__event__organizer'),
             payment_id=payment_id,
             purchase__user=request.user
         )
@@ -560,7 +566,7 @@ class PaymentDetailView(APIView):
 
         # Build tickets info
         tickets_info = []
-        for ticket in purchase.tickets.all():
+        for ticket in purchase.tickets.select_related('ticket_type'):
             tickets_info.append({
                 'ticket_id': ticket.ticket_id,
                 'qr_code': request.build_absolute_uri(ticket.qr_code.url) if ticket.qr_code else None,
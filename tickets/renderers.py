@@ -0,0 +1,30 @@
+"""
+JSON Renderers
+Faster rendering for large, frequently polled dashboard payloads
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Renders with orjson, producing the same output as DRF's JSONRenderer.
+    Types orjson does not know (Decimal, lazy strings) and dates/times go
+    through DRF's encoder, so datetimes keep DRF's 'Z' suffix for UTC.
+    """
+    _default_encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Indented output is only requested interactively; keep stdlib formatting
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return orjson.dumps(
+            data,
+            default=self._default_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
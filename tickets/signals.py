@@ -1,17 +1,51 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Ticket, Order, Payment
-from .utils import generate_ticket_qr_code, send_order_confirmation_email, send_ticket_email
+from .models import (
+    Ticket, Order, Payment, Purchase, Event, EventCategory, OrganizerRevenue, WithdrawalRequest,
+)
+from .cache import invalidate_category_cache, invalidate_dashboard_cache
+from .tasks import run_in_background, send_order_emails_task
+
+
+def _event_organizer_id(instance):
+    """Organizer of instance.event without loading the Event row"""
+    if instance._meta.get_field("event").is_cached(instance):
+        return instance.event.organizer_id
+    return Event.objects.filter(pk=instance.event_id).values_list("organizer_id", flat=True).first()
+
+
+@receiver(post_save, sender=Purchase)
+def invalidate_stats_on_purchase(sender, instance, **kwargs):
+    """Drop cached dashboard payloads for the buyer and the organizer"""
+    invalidate_dashboard_cache(instance.user_id, _event_organizer_id(instance))
+
+
+@receiver(post_save, sender=Event)
+def invalidate_stats_on_event(sender, instance, **kwargs):
+    """Drop cached dashboard payloads and category counts for the organizer's event"""
+    invalidate_dashboard_cache(instance.organizer_id)
+    invalidate_category_cache()
+
+
+@receiver(post_save, sender=EventCategory)
+@receiver(post_delete, sender=EventCategory)
+@receiver(post_delete, sender=Event)
+def invalidate_category_list(sender, instance, **kwargs):
+    """Drop the cached category list when categories or their event counts change"""
+    invalidate_category_cache()
 
 
 @receiver(post_save, sender=Ticket)
-def create_ticket_qr_code(sender, instance, created, **kwargs):
-    """Generate QR code when ticket is created"""
-    if created and not instance.qr_code:
-        try:
-            generate_ticket_qr_code(instance)
-        except Exception as e:
-            print(f"Error generating QR code for ticket {instance.ticket_number}: {e}")
+def invalidate_stats_on_ticket(sender, instance, **kwargs):
+    """Drop cached dashboard payloads for the ticket holder and the organizer"""
+    invalidate_dashboard_cache(instance.user_id, _event_organizer_id(instance))
+
+
+@receiver(post_save, sender=OrganizerRevenue)
+@receiver(post_save, sender=WithdrawalRequest)
+def invalidate_revenue_on_change(sender, instance, **kwargs):
+    """Drop cached revenue dashboards when earnings or withdrawals change"""
+    invalidate_dashboard_cache(instance.organizer_id)
 
 
 @receiver(post_save, sender=Order)
@@ -19,13 +53,7 @@ def send_order_confirmation(sender, instance, created, update_fields, **kwargs):
     """Send order confirmation email when order is completed"""
     if not created and instance.status == "completed":
         if update_fields and "status" in update_fields:
-            try:
-                send_order_confirmation_email(instance)
-
-                for ticket in instance.tickets.all():
-                    send_ticket_email(ticket)
-            except Exception as e:
-                print(f"Error sending order confirmation for {instance.order_id}: {e}")
+            run_in_background(send_order_emails_task, instance.pk)
 
 
 # @receiver(post_save, sender=Payment)
@@ -0,0 +1,36 @@
+"""
+Background tasks for the tickets app.
+
+Slow side effects such as SMTP delivery are handed to the app's worker pool
+once the surrounding database transaction commits, so the request that
+triggered them can return immediately. Tasks take primary keys rather than
+model instances and reload what they need on the worker thread.
+"""
+
+from cafa_ticket.background import BackgroundRunner
+
+from .models import Order, Purchase
+from .utils import send_order_confirmation_email, send_purchase_ticket_email
+
+_runner = BackgroundRunner("tickets-tasks")
+
+# Queue func(*args) on the tickets pool after the current transaction commits
+run_in_background = _runner.submit
+
+
+def send_purchase_ticket_email_task(purchase_id):
+    """Email the buyer their tickets for a completed purchase"""
+    purchase = Purchase.objects.select_related("event").filter(pk=purchase_id).first()
+    if purchase is None:
+        return
+    send_purchase_ticket_email(purchase)
+
+
+def send_order_emails_task(order_id):
+    """Send the order confirmation"""
+    order = Order.objects.select_related("event").filter(pk=order_id).first()
+    if order is None:
+        return
+    # Order has no tickets relation, so there are no per-ticket emails to
+    # send from here; purchases email their tickets separately
+    send_order_confirmation_email(order)
@@ -1,3 +1,445 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import User
+from .cache import dashboard_cache_key
+from .models import Event, OrganizerRevenue, Purchase, Ticket, TicketType
+from .utils import parse_ticket_qr_payload, ticket_qr_payload
+
+
+def make_event(organizer, **kwargs):
+    fields = {
+        'title': 'Accra Jazz Night',
+        'description': 'An evening of live jazz in the heart of Accra.',
+        'short_description': 'Live jazz in Accra',
+        'max_attendees': 100,
+        **kwargs,
+    }
+    return Event.objects.create(organizer=organizer, **fields)
+
+
+def make_purchase(user, ticket_type, quantity, status='completed', ticket_status='paid'):
+    """A purchase with one ticket per unit in the given statuses"""
+    subtotal = ticket_type.price * quantity
+    purchase = Purchase.objects.create(
+        user=user,
+        event=ticket_type.event,
+        ticket_type=ticket_type,
+        quantity=quantity,
+        buyer_name='Kofi Mensah',
+        buyer_email='kofi@example.com',
+        buyer_phone='+233241234567',
+        ticket_price=ticket_type.price,
+        subtotal=subtotal,
+        service_fee=subtotal * Decimal('0.05'),
+        total=subtotal * Decimal('1.05'),
+        status=status,
+    )
+    for number in range(quantity):
+        Ticket.objects.create(
+            purchase=purchase,
+            event=ticket_type.event,
+            ticket_type=ticket_type,
+            attendee_name=f'Attendee {number}',
+            attendee_email=f'attendee{number}@example.com',
+            attendee_phone='+233241234567',
+            price=ticket_type.price,
+            status=ticket_status,
+        )
+    return purchase
+
+
+def make_revenue(purchase, earnings, **kwargs):
+    """An organizer revenue record for a purchase, with no platform fee taken"""
+    return OrganizerRevenue.objects.create(
+        organizer=purchase.event.organizer,
+        event=purchase.event,
+        purchase=purchase,
+        ticket_sales_amount=earnings,
+        platform_fee=Decimal('0'),
+        organizer_earnings=earnings,
+        **kwargs
+    )
+
+
+class TicketsAPITestCase(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user('organizer', 'organizer@example.com', 'pass12345')
+        self.buyer = User.objects.create_user('buyer', 'buyer@example.com', 'pass12345')
+        self.event = make_event(self.organizer)
+        self.ticket_type = TicketType.objects.create(
+            event=self.event, name='Regular', price=Decimal('50.00'), quantity=10
+        )
+        self.client = APIClient()
+
+
+class EventAnalyticsTests(TicketsAPITestCase):
+    """Daily and running totals come from window sums over purchase rows"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.organizer)
+
+    def _purchase_on(self, day, quantity, **kwargs):
+        purchase = make_purchase(self.buyer, self.ticket_type, quantity, **kwargs)
+        Purchase.objects.filter(pk=purchase.pk).update(
+            created_at=timezone.make_aware(datetime(2025, 1, day, 10, 0))
+        )
+        return purchase
+
+    def test_sales_timeline_daily_and_cumulative_totals(self):
+        self._purchase_on(10, 2)
+        self._purchase_on(10, 1)
+        late = self._purchase_on(11, 1)
+        self._purchase_on(11, 1, status='pending', ticket_status='reserved')
+        late.tickets.update(is_checked_in=True)
+
+        response = self.client.get(reverse('event-analytics', args=[self.event.id]))
+
+        self.assertEqual(response.status_code, 200)
+        timeline = [
+            (
+                day['date'], day['tickets_sold'], Decimal(day['revenue']),
+                day['cumulative_tickets'], Decimal(day['cumulative_revenue']),
+            )
+            for day in response.data['sales_timeline']
+        ]
+        self.assertEqual(timeline, [
+            ('2025-01-10', 3, Decimal('150'), 3, Decimal('150')),
+            ('2025-01-11', 1, Decimal('50'), 4, Decimal('200')),
+        ])
+
+        overview = response.data['overview']
+        self.assertEqual(overview['tickets_sold'], 4)
+        self.assertEqual(overview['tickets_checked_in'], 1)
+        self.assertEqual(Decimal(overview['gross_revenue']), Decimal('200'))
+
+        [ticket_type] = response.data['sales_by_ticket_type']
+        self.assertEqual(ticket_type['tickets_sold'], 4)
+        self.assertEqual(Decimal(ticket_type['revenue']), Decimal('200'))
+
+
+class CancelPurchaseTests(TicketsAPITestCase):
+    """Cancelling expires outstanding tickets and releases the sold count"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.buyer)
+
+    def _cancel(self, purchase):
+        return self.client.post(reverse('cancel-purchase', args=[purchase.purchase_id]))
+
+    def test_cancel_expires_tickets_and_releases_count(self):
+        purchase = make_purchase(self.buyer, self.ticket_type, 2, status='reserved', ticket_status='reserved')
+        TicketType.objects.filter(pk=self.ticket_type.pk).update(tickets_sold=5)
+
+        response = self._cancel(purchase)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['tickets_released'], 2)
+        purchase.refresh_from_db()
+        self.assertEqual(purchase.status, 'expired')
+        self.assertFalse(purchase.tickets.exclude(status='expired').exists())
+        self.ticket_type.refresh_from_db()
+        self.assertEqual(self.ticket_type.tickets_sold, 3)
+
+    def test_cancel_never_drives_sold_count_negative(self):
+        purchase = make_purchase(self.buyer, self.ticket_type, 2, status='pending', ticket_status='reserved')
+        TicketType.objects.filter(pk=self.ticket_type.pk).update(tickets_sold=1)
+
+        self._cancel(purchase)
+
+        self.ticket_type.refresh_from_db()
+        self.assertEqual(self.ticket_type.tickets_sold, 0)
+
+    def test_completed_purchase_cannot_be_cancelled(self):
+        purchase = make_purchase(self.buyer, self.ticket_type, 1)
+
+        response = self._cancel(purchase)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(purchase.tickets.get().status, 'paid')
+
+
+class EventAttendeesPaginationTests(TicketsAPITestCase):
+    """Page-number responses stay the default; cursor pages are opt-in"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.organizer)
+        make_purchase(self.buyer, self.ticket_type, 3)
+        self.url = reverse('event-attendees', args=[self.event.id])
+
+    def test_default_response_is_unchanged_for_page_clients(self):
+        response = self.client.get(self.url, {'page': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_pages_cover_every_attendee_once(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('cursor=', response.data['next'])
+        seen = [row['ticket_id'] for row in response.data['results']]
+        self.assertEqual(len(seen), 2)
+
+        response = self.client.get(response.data['next'])
+
+        self.assertIsNone(response.data['next'])
+        seen += [row['ticket_id'] for row in response.data['results']]
+        self.assertCountEqual(seen, Ticket.objects.values_list('ticket_id', flat=True))
+
+
+class TicketQRPayloadTests(SimpleTestCase):
+    """Check-in accepts compact payloads, legacy JSON payloads and bare IDs"""
+
+    def test_compact_payload(self):
+        self.assertEqual(parse_ticket_qr_payload('T|12|TKT-ABC123'), 'TKT-ABC123')
+
+    def test_legacy_json_payloads(self):
+        webhook_payload = json.dumps({
+            'ticket_id': 'TKT-ABC123', 'event_id': 12, 'verification_hash': 'TKT-ABC123'
+        })
+        model_payload = json.dumps({
+            'ticket_id': 'TKT-ABC123', 'event_id': '12', 'attendee_name': 'Ama Mensah'
+        })
+
+        self.assertEqual(parse_ticket_qr_payload(webhook_payload), 'TKT-ABC123')
+        self.assertEqual(parse_ticket_qr_payload(model_payload), 'TKT-ABC123')
+
+    def test_bare_and_unparseable_values_pass_through(self):
+        self.assertEqual(parse_ticket_qr_payload('TKT-ABC123'), 'TKT-ABC123')
+        self.assertEqual(parse_ticket_qr_payload('{not json'), '{not json')
+
+
+class TicketQRRoundTripTests(TicketsAPITestCase):
+    """Payloads printed on tickets resolve back to the ticket at check-in"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.organizer)
+        self.first, self.second = make_purchase(self.buyer, self.ticket_type, 2).tickets.order_by('id')
+        self.url = reverse('event-checkin', args=[self.event.id])
+
+    def test_payload_round_trip(self):
+        payload = ticket_qr_payload(self.first)
+
+        self.assertEqual(payload, f'T|{self.event.id}|{self.first.ticket_id}')
+        self.assertEqual(parse_ticket_qr_payload(payload), self.first.ticket_id)
+
+    def test_check_in_with_compact_and_legacy_payloads(self):
+        legacy_payload = json.dumps({
+            'ticket_id': self.second.ticket_id,
+            'event_id': self.event.id,
+            'verification_hash': self.second.ticket_id,
+        })
+
+        for ticket, payload in ((self.first, ticket_qr_payload(self.first)), (self.second, legacy_payload)):
+            response = self.client.post(self.url, {'ticket_id': payload}, format='json')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['ticket']['ticket_id'], ticket.ticket_id)
+            ticket.refresh_from_db()
+            self.assertTrue(ticket.is_checked_in)
+
+
+class OrganizerRevenueTests(TicketsAPITestCase):
+    """Revenue dashboard totals, fee split, balances and monthly series"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.organizer)
+        self.url = reverse('organizer-revenue')
+        self.now = timezone.now()
+
+    def _get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def _purchase_at(self, created_at, quantity, ticket_type=None):
+        purchase = make_purchase(self.buyer, ticket_type or self.ticket_type, quantity)
+        Purchase.objects.filter(pk=purchase.pk).update(created_at=created_at)
+        return purchase
+
+    def test_summary_and_fee_split_by_event(self):
+        other_event = make_event(self.organizer, title='Kumasi Food Fair')
+        other_type = TicketType.objects.create(
+            event=other_event, name='Regular', price=Decimal('50.00'), quantity=10
+        )
+        make_purchase(self.buyer, self.ticket_type, 2)
+        make_purchase(self.buyer, self.ticket_type, 1)
+        make_purchase(self.buyer, other_type, 1)
+        make_purchase(self.buyer, self.ticket_type, 1, status='pending', ticket_status='reserved')
+
+        data = self._get()
+
+        summary = data['summary']
+        self.assertEqual(Decimal(summary['gross_revenue']), Decimal('200'))
+        self.assertEqual(Decimal(summary['platform_fees']), Decimal('10'))
+        self.assertEqual(Decimal(summary['net_revenue']), Decimal('190'))
+        self.assertEqual(summary['total_tickets_sold'], 4)
+        self.assertEqual(summary['total_events'], 2)
+
+        by_event = [
+            (
+                row['event_id'], Decimal(row['gross_revenue']), Decimal(row['platform_fee']),
+                Decimal(row['net_revenue']), row['tickets_sold'],
+            )
+            for row in data['revenue_by_event']
+        ]
+        self.assertEqual(by_event, [
+            (self.event.id, Decimal('150'), Decimal('7.50'), Decimal('142.50'), 3),
+            (other_event.id, Decimal('50'), Decimal('2.50'), Decimal('47.50'), 1),
+        ])
+
+    def test_payout_balances(self):
+        purchase = make_purchase(self.buyer, self.ticket_type, 1)
+        make_revenue(purchase, Decimal('95.00'), status='available')
+        released = make_revenue(
+            purchase, Decimal('47.50'), status='pending', available_at=self.now - timedelta(hours=1)
+        )
+        make_revenue(purchase, Decimal('20.00'), status='pending', available_at=self.now + timedelta(days=3))
+        make_revenue(purchase, Decimal('30.00'), status='withdrawn', is_withdrawn=True)
+        make_revenue(purchase, Decimal('10.00'), status='on_hold')
+
+        payout = self._get()['payout_status']
+
+        self.assertEqual(Decimal(payout['available_balance']), Decimal('142.50'))
+        self.assertEqual(Decimal(payout['pending_balance']), Decimal('20.00'))
+        self.assertEqual(Decimal(payout['total_paid_out']), Decimal('30.00'))
+        # The dashboard reads only; release_pending flips the status
+        released.refresh_from_db()
+        self.assertEqual(released.status, 'pending')
+
+    def test_monthly_series_is_gapless_and_newest_first(self):
+        first_day_this_month = self.now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        mid_last_month = (first_day_this_month - timedelta(days=1)).replace(day=15, hour=12)
+        self._purchase_at(self.now, 1)
+        self._purchase_at(mid_last_month, 2)
+        self._purchase_at(self.now - timedelta(days=400), 3)
+
+        months = self._get()['revenue_by_month']
+
+        self.assertEqual(len(months), 12)
+        self.assertEqual(months[0]['month'], self.now.strftime('%Y-%m'))
+        self.assertEqual(months[1]['month'], mid_last_month.strftime('%Y-%m'))
+        for newer, older in zip(months, months[1:]):
+            year, month = map(int, newer['month'].split('-'))
+            expected = f'{year:04d}-{month - 1:02d}' if month > 1 else f'{year - 1:04d}-12'
+            self.assertEqual(older['month'], expected)
+
+        self.assertEqual(Decimal(months[0]['gross_revenue']), Decimal('50'))
+        self.assertEqual(Decimal(months[1]['gross_revenue']), Decimal('100'))
+        self.assertEqual(Decimal(months[1]['platform_fee']), Decimal('5'))
+        self.assertEqual(Decimal(months[1]['net_revenue']), Decimal('95'))
+        self.assertEqual(months[1]['tickets_sold'], 2)
+        self.assertEqual(sum(Decimal(m['gross_revenue']) for m in months), Decimal('150'))
+
+    def test_periods_are_half_open(self):
+        first_day_this_month = self.now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        mid_last_month = (first_day_this_month - timedelta(days=1)).replace(day=15, hour=12)
+        self._purchase_at(mid_last_month, 2)
+        self._purchase_at(first_day_this_month, 1)
+
+        last_month = self._get(period='last_month')
+        this_month = self._get(period='this_month')
+
+        self.assertEqual(Decimal(last_month['summary']['gross_revenue']), Decimal('100'))
+        self.assertEqual(Decimal(this_month['summary']['gross_revenue']), Decimal('50'))
+        self.assertEqual(self._get(period='bogus')['period'], 'all_time')
+
+
+class ReleasePendingRevenueTests(TicketsAPITestCase):
+    """Pending revenue becomes available once its hold has passed"""
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        purchase = make_purchase(self.buyer, self.ticket_type, 1)
+        self.due = make_revenue(purchase, Decimal('47.50'), status='pending', available_at=now - timedelta(minutes=1))
+        self.held = make_revenue(purchase, Decimal('20.00'), status='pending', available_at=now + timedelta(days=3))
+
+        other_organizer = User.objects.create_user('other', 'other@example.com', 'pass12345')
+        other_event = make_event(other_organizer, title='Tamale Arts Week')
+        other_type = TicketType.objects.create(
+            event=other_event, name='Regular', price=Decimal('50.00'), quantity=10
+        )
+        self.other_due = make_revenue(
+            make_purchase(self.buyer, other_type, 1), Decimal('47.50'),
+            status='pending', available_at=now - timedelta(minutes=1),
+        )
+
+    def _statuses(self):
+        return [
+            OrganizerRevenue.objects.get(pk=record.pk).status
+            for record in (self.due, self.held, self.other_due)
+        ]
+
+    def test_release_for_one_organizer(self):
+        self.assertEqual(OrganizerRevenue.release_pending(organizer=self.organizer), 1)
+        self.assertEqual(self._statuses(), ['available', 'pending', 'pending'])
+
+    def test_management_command_releases_every_due_record(self):
+        out = StringIO()
+
+        call_command('release_pending_revenue', stdout=out)
+
+        self.assertIn('Released 2 revenue record(s)', out.getvalue())
+        self.assertEqual(self._statuses(), ['available', 'pending', 'available'])
+
+
+class DashboardCacheInvalidationTests(TicketsAPITestCase):
+    """Writes that change dashboard figures bump the affected users' cache version"""
+
+    def _keys(self, *users):
+        return [dashboard_cache_key(user.id, 'org_rev', 'all_time') for user in users]
+
+    def test_ticket_and_purchase_saves_bump_buyer_and_organizer(self):
+        bystander = User.objects.create_user('bystander', 'bystander@example.com', 'pass12345')
+        purchase = make_purchase(self.buyer, self.ticket_type, 1)
+        ticket = Ticket.objects.get(purchase=purchase)
+
+        for instance in (ticket, purchase):
+            before = self._keys(self.buyer, self.organizer, bystander)
+            instance.save()
+            after = self._keys(self.buyer, self.organizer, bystander)
+
+            self.assertNotEqual(after[0], before[0])
+            self.assertNotEqual(after[1], before[1])
+            self.assertEqual(after[2], before[2])
+
+    def test_revenue_dashboard_is_refreshed_by_new_revenue(self):
+        self.client.force_authenticate(self.organizer)
+        url = reverse('organizer-revenue')
+        purchase = make_purchase(self.buyer, self.ticket_type, 1)
+
+        before = self.client.get(url).data['payout_status']['available_balance']
+        make_revenue(purchase, Decimal('95.00'), status='available')
+        after = self.client.get(url).data['payout_status']['available_balance']
+
+        self.assertEqual(Decimal(before), Decimal('0'))
+        self.assertEqual(Decimal(after), Decimal('95.00'))
+
+    def test_unsignalled_update_is_served_from_cache(self):
+        self.client.force_authenticate(self.organizer)
+        url = reverse('organizer-revenue')
+        revenue = make_revenue(make_purchase(self.buyer, self.ticket_type, 1), Decimal('95.00'), status='available')
+
+        self.client.get(url)
+        OrganizerRevenue.objects.filter(pk=revenue.pk).update(status='on_hold')
+        cached = self.client.get(url).data['payout_status']['available_balance']
+
+        # Queryset update()s skip the signals, so callers must invalidate
+        self.assertEqual(Decimal(cached), Decimal('95.00'))
@@ -4,36 +4,129 @@ Ticket Management and Dashboard Views
 from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Sum, Count, Q
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.db.models import (
+    Sum, Count, Q, F, Prefetch, OuterRef, Subquery, IntegerField, DecimalField, ExpressionWrapper,
+    Window,
+)
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, ExtractHour
+from django.http import HttpResponse, FileResponse, Http404
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
 from decimal import Decimal
+from datetime import timedelta
+from functools import lru_cache
 
-from .models import Ticket, Event, Purchase
-from .purchase_serializers import TicketSerializer, CheckInSerializer, TicketDetailSerializer
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from .models import Ticket, Event, Purchase, Payment, OrganizerRevenue
+from .cache import dashboard_cache_key, DASHBOARD_CACHE_TIMEOUT
+from .renderers import FastJSONRenderer
+from .purchase_serializers import (
+    TicketSerializer, CheckInSerializer, TicketDetailSerializer, AttendedTicketSerializer
+)
+
+# Ticket PDFs only use built-in Helvetica, so skip ReportLab's per-attribute
+# shape validation and resolve the page geometry once at import.
+rl_config.shapeChecking = 0
+TICKET_PDF_HEIGHT = letter[1]
+TICKET_PDF_LEFT = 100
+
+# Platform commission on ticket subtotals (5%)
+_FEE_RATE = Decimal('0.05')
+_NET_RATE = Decimal('0.95')
+
+
+@lru_cache(maxsize=1)
+def _next_payout_date(today):
+    """Payouts run on the 15th; only changes once per day"""
+    if today.day < 15:
+        return today.replace(day=15)
+    return (today.replace(day=1) + timedelta(days=32)).replace(day=15)
+
+
+def _paid_tickets_subquery():
+    """
+    Paid ticket count for the outer Purchase row. Used instead of a tickets
+    join so Sum('subtotal') is not repeated once per ticket.
+    """
+    paid_tickets = Ticket.objects.filter(
+        purchase=OuterRef('pk'),
+        status='paid'
+    ).order_by().values('purchase').annotate(count=Count('id')).values('count')
+    return Coalesce(Subquery(paid_tickets, output_field=IntegerField()), 0)
+
+
+def _get_event(slug_or_id, user):
+    """
+    Fetch one of the user's events: all digits means an ID, anything else a slug.
+    Raises Http404 when no matching event exists.
+    """
+    if slug_or_id.isdigit():
+        return get_object_or_404(Event, id=int(slug_or_id), organizer=user)
+    return get_object_or_404(Event, slug=slug_or_id, organizer=user)
+
+
+# Columns TicketSerializer reads; skips wide event/ticket-type text columns
+MY_TICKETS_FIELDS = (
+    'ticket_id', 'qr_code', 'attendee_name', 'attendee_email', 'attendee_phone',
+    'status', 'is_checked_in', 'checked_in_at', 'created_at',
+    'event__id', 'event__title', 'event__slug', 'event__featured_image',
+    'event__venue_name', 'event__venue_city',
+    # Event.status is a property derived from the start/end date and time
+    'event__start_date', 'event__start_time', 'event__end_date', 'event__end_time',
+    'event__category__id', 'event__category__name',
+    'ticket_type__id', 'ticket_type__name', 'ticket_type__price',
+    'purchase__id', 'purchase__purchase_id',
+)
+
+
+class CreatedCursorPagination(CursorPagination):
+    """Keyset pagination over a user's rows, newest first"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
 
 
 class MyTicketsView(generics.ListAPIView):
     """
     GET /api/v1/tickets/my-tickets/
+    Pass ?pagination=cursor for keyset pages (no count, constant cost per page)
     """
     serializer_class = TicketSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = PageNumberPagination
+    renderer_classes = [FastJSONRenderer]
+
+    @property
+    def paginator(self):
+        # Cursor links carry the pagination param forward, so deep pages
+        # stay on an index range scan of (user, -created_at)
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = CreatedCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_queryset(self):
-        queryset = Ticket.objects.filter(purchase__user=self.request.user).select_related(
+        queryset = Ticket.objects.filter(user=self.request.user).select_related(
             'event', 'event__category', 'ticket_type', 'purchase'
-        )
+        ).only(*MY_TICKETS_FIELDS)
 
         # Filter by status
         ticket_status = self.request.query_params.get('status', 'all')
         if ticket_status != 'all':
             queryset = queryset.filter(status=ticket_status)
 
-        # Search
+        # Search (substring match on ticket ID or event title)
         search = self.request.query_params.get('search')
         if search:
             queryset = queryset.filter(
@@ -56,10 +149,11 @@ class MyTicketsView(generics.ListAPIView):
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
         
-        # If pagination is disabled, still return paginated structure
-        serializer = self.get_serializer(queryset, many=True)
+        # If pagination is disabled, still return paginated structure;
+        # stream rows instead of filling the queryset result cache
+        serializer = self.get_serializer(queryset.iterator(chunk_size=500), many=True)
         return Response({
-            'count': len(serializer.data),
+            'count': queryset.count(),
             'next': None,
             'previous': None,
             'results': serializer.data
@@ -74,7 +168,9 @@ class TicketDetailView(APIView):
 
     def get(self, request, ticket_id):
         ticket = get_object_or_404(
-            Ticket,
+            Ticket.objects.select_related(
+                'event', 'event__category', 'event__organizer', 'ticket_type', 'purchase'
+            ),
             ticket_id=ticket_id,
             purchase__user=request.user
         )
@@ -91,10 +187,7 @@ class CheckInTicketView(APIView):
 
     def post(self, request, slug_or_id):
         # Get event by slug or ID
-        if slug_or_id.isdigit():
-            event = get_object_or_404(Event, id=int(slug_or_id), organizer=request.user)
-        else:
-            event = get_object_or_404(Event, slug=slug_or_id, organizer=request.user)
+        event = _get_event(slug_or_id, request.user)
 
         serializer = CheckInSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -180,10 +273,7 @@ class CheckInHistoryView(APIView):
 
     def get(self, request, slug_or_id):
         # Get event by slug or ID
-        if slug_or_id.isdigit():
-            event = get_object_or_404(Event, id=int(slug_or_id), organizer=request.user)
-        else:
-            event = get_object_or_404(Event, slug=slug_or_id, organizer=request.user)
+        event = _get_event(slug_or_id, request.user)
 
         # Get last 10 checked-in tickets
         recent_checkins = Ticket.objects.filter(
@@ -214,6 +304,18 @@ class CheckInHistoryView(APIView):
         return Response(results, status=status.HTTP_200_OK)
     
 
+class AttendeeCursorPagination(CursorPagination):
+    """
+    Keyset pagination for attendee lists sorted by purchase date.
+    Tickets are created together with their purchase, so the ticket's own
+    created_at (indexed with event) stands in for purchase__created_at.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', 'id')
+
+
 class EventAttendeesView(generics.ListAPIView):
     """
     GET /api/v1/events/{slug_or_id}/attendees/
@@ -223,10 +325,7 @@ class EventAttendeesView(generics.ListAPIView):
 
     def get(self, request, slug_or_id):
         # Get event by slug or ID
-        if slug_or_id.isdigit():
-            event = get_object_or_404(Event, id=int(slug_or_id), organizer=request.user)
-        else:
-            event = get_object_or_404(Event, slug=slug_or_id, organizer=request.user)
+        event = _get_event(slug_or_id, request.user)
 
         queryset = Ticket.objects.filter(event=event).select_related(
             'ticket_type', 'purchase', 'checked_in_by'
@@ -279,6 +378,19 @@ class EventAttendeesView(generics.ListAPIView):
         order_by = sort_mapping.get(sort_by, '-purchase__created_at')
         queryset = queryset.order_by(order_by)
 
+        # Pass ?pagination=cursor with a purchase-date sort for keyset pages;
+        # everything else keeps page numbers
+        use_cursor = (
+            request.query_params.get('pagination') == 'cursor'
+            and order_by in ('purchase__created_at', '-purchase__created_at')
+        )
+        if use_cursor:
+            paginator = AttendeeCursorPagination()
+            if order_by == 'purchase__created_at':
+                paginator.ordering = ('created_at', 'id')
+        else:
+            paginator = self.pagination_class()
+
         # Summary (before pagination)
         summary = {
             'total_attendees': queryset.count(),
@@ -292,26 +404,28 @@ class EventAttendeesView(generics.ListAPIView):
         else:
             summary['check_in_percentage'] = 0.0
 
+        # Payment reference as a correlated subquery instead of a lookup per row
+        queryset = queryset.annotate(
+            first_payment_ref=Subquery(
+                Payment.objects.filter(purchase=OuterRef('purchase_id')).values('reference')[:1]
+            )
+        )
+
         # Paginate
-        paginator = self.pagination_class()
         page = paginator.paginate_queryset(queryset, request)
 
-        # ✅ Handle case when page is None
+        # ✅ Handle case when page is None (stream rows, skip the result cache)
         if page is not None:
             tickets = page
         else:
-            tickets = queryset
+            tickets = queryset.iterator(chunk_size=500)
 
         results = []
         for ticket in tickets:
             # Get payment reference
-            payment_reference = None
-            if ticket.purchase:
-                if hasattr(ticket.purchase, 'payments') and ticket.purchase.payments.exists():
-                    payment = ticket.purchase.payments.first()
-                    payment_reference = payment.payment_reference if hasattr(payment, 'payment_reference') else payment.payment_id
-                else:
-                    payment_reference = ticket.purchase.purchase_id
+            payment_reference = ticket.first_payment_ref or (
+                ticket.purchase.purchase_id if ticket.purchase else None
+            )
 
             # Build checked_in_by object
             checked_in_by = None
@@ -344,11 +458,12 @@ class EventAttendeesView(generics.ListAPIView):
         # ✅ Return paginated response if page exists, otherwise plain response
         if page is not None:
             response = paginator.get_paginated_response(results)
+            response.data.setdefault('count', summary['total_attendees'])
             response.data['summary'] = summary
             return response
         
         return Response({
-            'count': len(results),
+            'count': summary['total_attendees'],
             'next': None,
             'previous': None,
             'summary': summary,
@@ -367,6 +482,12 @@ class UserDashboardStatsView(APIView):
         user = request.user
         now = timezone.now()
 
+        # Serve the cached payload; signals bump the version on any change
+        cache_key = dashboard_cache_key(user.id, 'user_stats')
+        cached_stats = cache.get(cache_key)
+        if cached_stats is not None:
+            return Response(cached_stats)
+
         # Purchasing stats - tickets the user bought
         tickets = Ticket.objects.filter(purchase__user=user, status='paid')
         total_spent = Purchase.objects.filter(
@@ -424,8 +545,6 @@ class UserDashboardStatsView(APIView):
             }
 
         # Revenue by month (last 6 months)
-        from datetime import timedelta
-        from django.db.models.functions import TruncMonth
         
         six_months_ago = now - timedelta(days=180)
         revenue_by_month = []
@@ -435,10 +554,11 @@ class UserDashboardStatsView(APIView):
             status='completed',
             created_at__gte=six_months_ago
         ).annotate(
-            month=TruncMonth('created_at')
+            month=TruncMonth('created_at'),
+            paid_tickets=_paid_tickets_subquery()
         ).values('month').annotate(
             revenue=Sum('total'),
-            tickets_sold=Count('tickets', filter=Q(tickets__status='paid'))
+            tickets_sold=Sum('paid_tickets')
         ).order_by('-month')
 
         for month_data in monthly_revenue:
@@ -514,7 +634,7 @@ class UserDashboardStatsView(APIView):
         else:
             account_age_display = f"{account_age_days}d"
 
-        return Response({
+        stats = {
             'user_id': user.id,
             'username': user.username,
             'overview': {
@@ -546,7 +666,10 @@ class UserDashboardStatsView(APIView):
                 'revenue_by_month': revenue_by_month
             },
             'recent_activity': recent_activity
-        })
+        }
+        cache.set(cache_key, stats, DASHBOARD_CACHE_TIMEOUT)
+
+        return Response(stats)
 
 
 class EventAnalyticsView(APIView):
@@ -557,103 +680,113 @@ class EventAnalyticsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, slug_or_id):
-        # Try to get event by slug first, then by ID
         try:
-            event = Event.objects.get(slug=slug_or_id, organizer=request.user)
-        except Event.DoesNotExist:
-            try:
-                event = Event.objects.get(id=slug_or_id, organizer=request.user)
-            except (Event.DoesNotExist, ValueError):
-                return Response({
+            event = _get_event(slug_or_id, request.user)
+        except Http404:
+            return Response({
                     'error': 'Event not found',
                     'message': "This event does not exist or you don't have permission to view it."
                 }, status=status.HTTP_404_NOT_FOUND)
 
         # Calculate metrics
+        # One aggregate over tickets and one over purchases; joining the two
+        # tables would multiply rows and inflate the revenue sums
         total_tickets = event.max_attendees
-        tickets_sold = event.tickets.filter(status='paid').count()
-        tickets_checked_in = event.tickets.filter(is_checked_in=True).count()
-
-        gross_revenue = Purchase.objects.filter(
-            event=event,
-            status='completed'
-        ).aggregate(total=Sum('subtotal'))['total'] or 0
+        ticket_totals = event.tickets.aggregate(
+            sold=Count('id', filter=Q(status='paid')),
+            checked_in=Count('id', filter=Q(is_checked_in=True)),
+        )
+        tickets_sold = ticket_totals['sold']
+        tickets_checked_in = ticket_totals['checked_in']
 
-        platform_fee = Purchase.objects.filter(
+        purchase_totals = Purchase.objects.filter(
             event=event,
             status='completed'
-        ).aggregate(total=Sum('service_fee'))['total'] or 0
+        ).aggregate(gross=Sum('subtotal'), fees=Sum('service_fee'))
+        gross_revenue = purchase_totals['gross'] or 0
+        platform_fee = purchase_totals['fees'] or 0
 
         net_revenue = gross_revenue
 
         # Calculate average ticket price
         average_ticket_price = round(gross_revenue / tickets_sold, 2) if tickets_sold > 0 else 0
 
+        # Paid counts, revenue and potential revenue per ticket type in one
+        # grouped query instead of a count query per type
+        ticket_type_rows = event.ticket_types.annotate(
+            sold_count=Count('tickets', filter=Q(tickets__status='paid')),
+        ).annotate(
+            revenue=ExpressionWrapper(
+                F('sold_count') * F('price'),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+            possible_revenue=ExpressionWrapper(
+                F('quantity') * F('price'),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+        ).values('id', 'name', 'price', 'quantity', 'sold_count', 'revenue', 'possible_revenue')
+
         # Calculate projected revenue (if all tickets sell)
-        total_possible_revenue = 0
-        for ticket_type in event.ticket_types.all():
-            total_possible_revenue += ticket_type.price * ticket_type.quantity
-        projected_revenue = total_possible_revenue
+        projected_revenue = 0
 
         # Sales by ticket type
         sales_by_ticket_type = []
-        for ticket_type in event.ticket_types.all():
-            sold_count = ticket_type.tickets.filter(status='paid').count()
-            revenue = sold_count * ticket_type.price
-            
+        for row in ticket_type_rows:
+            sold_count = row['sold_count']
+            projected_revenue += row['possible_revenue']
+
             percentage_of_total_sales = round((sold_count / tickets_sold * 100) if tickets_sold > 0 else 0, 2)
-            percentage_of_quantity_sold = round((sold_count / ticket_type.quantity * 100) if ticket_type.quantity > 0 else 0, 2)
-            
+            percentage_of_quantity_sold = round((sold_count / row['quantity'] * 100) if row['quantity'] > 0 else 0, 2)
+
             sales_by_ticket_type.append({
-                'ticket_type_id': ticket_type.id,
-                'ticket_type': ticket_type.name,
-                'price': str(ticket_type.price),
+                'ticket_type_id': row['id'],
+                'ticket_type': row['name'],
+                'price': str(row['price']),
                 'tickets_sold': sold_count,
-                'total_quantity': ticket_type.quantity,
-                'revenue': str(revenue),
+                'total_quantity': row['quantity'],
+                'revenue': str(row['revenue']),
                 'percentage_of_total_sales': percentage_of_total_sales,
                 'percentage_of_quantity_sold': percentage_of_quantity_sold
             })
 
         # Sales timeline (daily sales)
-        from django.db.models.functions import TruncDate
-        
+
+        # Daily and running totals are window sums over purchase rows
         daily_sales = Purchase.objects.filter(
             event=event,
             status='completed'
         ).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            tickets_sold=Count('tickets', filter=Q(tickets__status='paid')),
-            revenue=Sum('subtotal')
-        ).order_by('date')
+            date=TruncDate('created_at'),
+            paid_tickets=_paid_tickets_subquery()
+        ).annotate(
+            tickets_sold=Window(Sum('paid_tickets'), partition_by=F('date')),
+            revenue=Window(Sum('subtotal'), partition_by=F('date')),
+            cumulative_tickets=Window(Sum('paid_tickets'), order_by=F('date').asc()),
+            cumulative_revenue=Window(Sum('subtotal'), order_by=F('date').asc())
+        ).values(
+            'date', 'tickets_sold', 'revenue', 'cumulative_tickets', 'cumulative_revenue'
+        ).distinct().order_by('date')
 
         sales_timeline = []
-        cumulative_tickets = 0
-        cumulative_revenue = 0
-        
         for day in daily_sales:
-            cumulative_tickets += day['tickets_sold']
-            cumulative_revenue += day['revenue'] or 0
-            
             sales_timeline.append({
                 'date': day['date'].strftime('%Y-%m-%d'),
                 'tickets_sold': day['tickets_sold'],
                 'revenue': str(day['revenue'] or 0),
-                'cumulative_tickets': cumulative_tickets,
-                'cumulative_revenue': str(cumulative_revenue)
+                'cumulative_tickets': day['cumulative_tickets'],
+                'cumulative_revenue': str(day['cumulative_revenue'] or 0)
             })
 
         # Sales by hour
-        from django.db.models.functions import ExtractHour
         
         hourly_sales = Purchase.objects.filter(
             event=event,
             status='completed'
         ).annotate(
-            hour=ExtractHour('created_at')
+            hour=ExtractHour('created_at'),
+            paid_tickets=_paid_tickets_subquery()
         ).values('hour').annotate(
-            tickets_sold=Count('tickets', filter=Q(tickets__status='paid')),
+            tickets_sold=Sum('paid_tickets'),
             revenue=Sum('subtotal')
         ).order_by('hour')
 
@@ -678,12 +811,15 @@ class EventAnalyticsView(APIView):
         recent_purchases = Purchase.objects.filter(
             event=event,
             status='completed'
-        ).select_related('user').prefetch_related('tickets').order_by('-created_at')[:10]
+        ).select_related('user').prefetch_related(
+            Prefetch('tickets', queryset=Ticket.objects.select_related('ticket_type'))
+        ).order_by('-created_at')[:10]
 
         recent_sales = []
         for purchase in recent_purchases:
-            # Get first ticket from this purchase
-            first_ticket = purchase.tickets.first()
+            # Get first ticket from this purchase (.all() uses the prefetch cache, .first() does not)
+            purchase_tickets = purchase.tickets.all()
+            first_ticket = purchase_tickets[0] if purchase_tickets else None
             if first_ticket:
                 recent_sales.append({
                     'ticket_id': first_ticket.ticket_id,
@@ -723,6 +859,7 @@ class AttendedEventsView(generics.ListAPIView):
     GET /api/v1/tickets/attended-events/
     List events the user has attended (checked in)
     """
+    serializer_class = AttendedTicketSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = PageNumberPagination
 
@@ -730,116 +867,156 @@ class AttendedEventsView(generics.ListAPIView):
         return Ticket.objects.filter(
             purchase__user=self.request.user,
             is_checked_in=True
-        ).select_related('event', 'event__category', 'ticket_type').order_by('-checked_in_at')
+        ).select_related('event', 'event__category', 'ticket_type').only(
+            'ticket_id', 'checked_in_at', 'event', 'ticket_type', 'event__category',
+            'event__id', 'event__title', 'event__slug', 'event__featured_image',
+            'event__venue_name', 'event__start_date', 'event__category__name',
+            'ticket_type__name', 'ticket_type__price'
+        ).order_by('-checked_in_at')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # Resolve the host prefix once; media URLs are root-relative (MEDIA_URL)
+        context['base_url'] = self.request.build_absolute_uri('/').rstrip('/')
+        return context
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         page = self.paginate_queryset(queryset)
 
-        # ✅ Handle case when page is None (no results or pagination disabled)
-        if page is not None:
-            tickets = page
-        else:
-            tickets = queryset
-
-        results = []
-        for ticket in tickets:
-            results.append({
-                'event': {
-                    'id': ticket.event.id,
-                    'title': ticket.event.title,
-                    'slug': ticket.event.slug,
-                    'featured_image': request.build_absolute_uri(ticket.event.featured_image.url) if ticket.event.featured_image else None,
-                    'category': ticket.event.category.name if ticket.event.category else None,
-                    'venue_name': ticket.event.venue_name,
-                    'event_date': ticket.event.start_date
-                },
-                'ticket_id': ticket.ticket_id,
-                'ticket_type': ticket.ticket_type.name if ticket.ticket_type else None,
-                'attended_date': ticket.checked_in_at,
-                'amount_paid': str(ticket.ticket_type.price) if ticket.ticket_type else '0.00'
-            })
-
         # ✅ ALWAYS return paginated response for consistency
         if page is not None:
-            return self.get_paginated_response(results)
-        
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         # ✅ Return pagination structure even when page is None
+        serializer = self.get_serializer(queryset.iterator(chunk_size=500), many=True)
         return Response({
-            'count': len(results),
+            'count': queryset.count(),
             'next': None,
             'previous': None,
-            'results': results
+            'results': serializer.data
         })
 
 
+def _render_ticket_pdf(ticket, output, updated_at):
+    """Draw the ticket PDF onto a writable file-like object"""
+    p = canvas.Canvas(output, pagesize=letter)
+
+    # Add ticket information
+    p.setFont("Helvetica-Bold", 24)
+    p.drawString(TICKET_PDF_LEFT, TICKET_PDF_HEIGHT - 100, "Event Ticket")
+
+    # Body lines go through one text object instead of a drawString each;
+    # empty strings keep the original 40pt gaps between sections.
+    text = p.beginText(TICKET_PDF_LEFT, TICKET_PDF_HEIGHT - 150)
+    text.setFont("Helvetica", 12, leading=20)
+    text.textLines([
+        f"Event: {ticket.event.title}",
+        f"Date: {ticket.event.start_date} at {ticket.event.start_time}",
+        f"Venue: {ticket.event.venue_name}, {ticket.event.venue_city}",
+        "",
+        f"Ticket ID: {ticket.ticket_id}",
+        f"Ticket Type: {ticket.ticket_type.name if ticket.ticket_type else 'N/A'}",
+        f"Attendee: {ticket.attendee_name}",
+        f"Email: {ticket.attendee_email}",
+        "",
+    ])
+
+    # QR Code (if available)
+    # TODO: Add actual QR code image to PDF
+    text.textLine("QR Code: Scan at venue entrance" if ticket.qr_code else "")
+    text.textLine("")
+
+    text.setFont("Helvetica", 10, leading=15)
+    text.textLines([
+        f"Purchase Reference: {ticket.purchase.purchase_id}",
+        # The stored PDF is reused until something on it changes, so stamp it
+        # with that revision rather than the render time
+        f"Last updated: {updated_at.strftime('%Y-%m-%d %H:%M:%S')}",
+    ])
+    p.drawText(text)
+
+    p.showPage()
+    p.save()
+
+
+# Ticket PDFs carry attendee contact details, so they live outside public
+# MEDIA and are only ever streamed back by DownloadTicketView
+ticket_pdf_storage = FileSystemStorage(location=settings.PRIVATE_MEDIA_ROOT)
+
+
+def _store_ticket_pdf(pdf_dir, storage_path, content):
+    """
+    Save a rendered ticket PDF and drop the ticket's older revisions.
+    Storage renames on collision instead of overwriting, so when a concurrent
+    download saved the same revision first, the renamed copy is removed.
+    """
+    saved_path = ticket_pdf_storage.save(storage_path, ContentFile(content))
+    if saved_path != storage_path:
+        ticket_pdf_storage.delete(saved_path)
+
+    _, files = ticket_pdf_storage.listdir(pdf_dir)
+    current = storage_path.rsplit('/', 1)[1]
+    for name in files:
+        if name != current:
+            ticket_pdf_storage.delete(f"{pdf_dir}/{name}")
+
+
 class DownloadTicketView(APIView):
     """
     GET /api/v1/tickets/{ticket_id}/download/
-    Download ticket as PDF
+    Download ticket as PDF (rendered once per ticket/event revision, then served from private storage)
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, ticket_id):
         ticket = get_object_or_404(
-            Ticket,
+            Ticket.objects.select_related('event', 'ticket_type', 'purchase').only(
+                'ticket_id', 'attendee_name', 'attendee_email', 'qr_code', 'updated_at',
+                'event', 'event__title', 'event__start_date', 'event__start_time',
+                'event__venue_name', 'event__venue_city', 'event__updated_at',
+                'ticket_type', 'ticket_type__name', 'ticket_type__updated_at',
+                'purchase', 'purchase__purchase_id'
+            ),
             ticket_id=ticket_id,
             purchase__user=request.user
         )
 
-        # Generate PDF ticket
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter
-        from io import BytesIO
-
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-
-        # Add ticket information
-        p.setFont("Helvetica-Bold", 24)
-        p.drawString(100, height - 100, "Event Ticket")
-
-        p.setFont("Helvetica", 12)
-        y_position = height - 150
-
-        # Event details
-        p.drawString(100, y_position, f"Event: {ticket.event.title}")
-        y_position -= 20
-        p.drawString(100, y_position, f"Date: {ticket.event.start_date} at {ticket.event.start_time}")
-        y_position -= 20
-        p.drawString(100, y_position, f"Venue: {ticket.event.venue_name}, {ticket.event.venue_city}")
-        y_position -= 40
-
-        # Ticket details
-        p.drawString(100, y_position, f"Ticket ID: {ticket.ticket_id}")
-        y_position -= 20
-        p.drawString(100, y_position, f"Ticket Type: {ticket.ticket_type.name if ticket.ticket_type else 'N/A'}")
-        y_position -= 20
-        p.drawString(100, y_position, f"Attendee: {ticket.attendee_name}")
-        y_position -= 20
-        p.drawString(100, y_position, f"Email: {ticket.attendee_email}")
-        y_position -= 40
-
-        # QR Code (if available)
-        if ticket.qr_code:
-            p.drawString(100, y_position, "QR Code: Scan at venue entrance")
-            # TODO: Add actual QR code image to PDF
-
-        y_position -= 40
-        p.setFont("Helvetica", 10)
-        p.drawString(100, y_position, f"Purchase Reference: {ticket.purchase.purchase_id}")
-        y_position -= 15
-        p.drawString(100, y_position, f"Generated: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-        p.showPage()
-        p.save()
-
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="ticket-{ticket.ticket_id}.pdf"'
+        filename = f"ticket-{ticket.ticket_id}.pdf"
+
+        # Any edit to the ticket, its event or its ticket type yields a new
+        # storage path. Queryset update()s elsewhere skip updated_at, but none
+        # of them touch a field printed on the ticket.
+        updated_at = max(
+            stamp for stamp in (
+                ticket.updated_at,
+                ticket.event.updated_at,
+                ticket.ticket_type.updated_at if ticket.ticket_type else None,
+            ) if stamp is not None
+        )
+        pdf_dir = f"ticket_pdfs/{ticket.ticket_id}"
+        storage_path = f"{pdf_dir}/{int(updated_at.timestamp())}.pdf"
+        if ticket_pdf_storage.exists(storage_path):
+            return FileResponse(
+                ticket_pdf_storage.open(storage_path, 'rb'),
+                as_attachment=True,
+                filename=filename,
+                content_type='application/pdf'
+            )
+
+        # HttpResponse is file-like, so the canvas writes straight into it
+        response = HttpResponse(content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        _render_ticket_pdf(ticket, response, updated_at)
+        _store_ticket_pdf(pdf_dir, storage_path, response.content)
+
         return response
 
+
+REVENUE_PERIODS = ('all_time', 'this_month', 'last_month', 'this_year')
+
+
 class OrganizerRevenueView(APIView):
     """
     GET /api/v1/organizers/revenue/
@@ -848,27 +1025,36 @@ class OrganizerRevenueView(APIView):
     - period: all_time (default), this_month, last_month, this_year
     """
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [FastJSONRenderer]
 
     def get(self, request):
         user = request.user
         now = timezone.now()
 
-        # Get period filter
+        # Get period filter; anything unrecognised means all_time, which also
+        # keeps arbitrary values out of the cache key
         period = request.query_params.get('period', 'all_time')
+        if period not in REVENUE_PERIODS:
+            period = 'all_time'
+
+        # Serve the cached payload; signals bump the version on any change
+        cache_key = dashboard_cache_key(user.id, 'org_rev', period)
+        cached_revenue = cache.get(cache_key)
+        if cached_revenue is not None:
+            return Response(cached_revenue)
         
-        # Calculate date range based on period
+        # Calculate date range based on period as a half-open [start, end)
+        # interval; end_date is None for periods that run up to now
+        first_day_this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         if period == 'this_month':
-            start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_date = now
+            start_date = first_day_this_month
+            end_date = None
         elif period == 'last_month':
-            from datetime import timedelta
-            first_day_this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            last_day_last_month = first_day_this_month - timedelta(days=1)
-            start_date = last_day_last_month.replace(day=1)
-            end_date = last_day_last_month.replace(hour=23, minute=59, second=59)
+            start_date = (first_day_this_month - timedelta(days=1)).replace(day=1)
+            end_date = first_day_this_month
         elif period == 'this_year':
-            start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_date = now
+            start_date = first_day_this_month.replace(month=1)
+            end_date = None
         else:  # all_time
             start_date = None
             end_date = None
@@ -882,18 +1068,20 @@ class OrganizerRevenueView(APIView):
         if start_date:
             purchases_query = purchases_query.filter(created_at__gte=start_date)
         if end_date:
-            purchases_query = purchases_query.filter(created_at__lte=end_date)
+            purchases_query = purchases_query.filter(created_at__lt=end_date)
 
-        # Calculate summary
-        gross_revenue = purchases_query.aggregate(total=Sum('subtotal'))['total'] or Decimal('0')
-        platform_fee_percentage = Decimal('5.0')  # ✅ Define THEN convert to Decimal
-        platform_fees = gross_revenue * (platform_fee_percentage / Decimal('100'))
+        # Calculate summary (gross revenue and tickets sold in one query)
+        purchase_totals = purchases_query.annotate(
+            paid_tickets=_paid_tickets_subquery()
+        ).aggregate(
+            gross_revenue=Sum('subtotal'),
+            tickets_sold=Sum('paid_tickets')
+        )
+        gross_revenue = purchase_totals['gross_revenue'] or Decimal('0')
+        platform_fees = gross_revenue * _FEE_RATE
         net_revenue = gross_revenue - platform_fees
-        
-        total_tickets_sold = Ticket.objects.filter(
-            purchase__in=purchases_query,
-            status='paid'
-        ).count()
+
+        total_tickets_sold = purchase_totals['tickets_sold'] or 0
         
         total_events = Event.objects.filter(
             organizer=user,
@@ -903,7 +1091,6 @@ class OrganizerRevenueView(APIView):
         average_ticket_price = round(gross_revenue / total_tickets_sold, 2) if total_tickets_sold > 0 else Decimal('0')
 
         # REAL PAYOUT STATUS (using actual revenue records)
-        from .models import OrganizerRevenue
 
         # Get revenue records for this organizer
         revenue_queryset = OrganizerRevenue.objects.filter(organizer=user)
@@ -912,117 +1099,119 @@ class OrganizerRevenueView(APIView):
         if start_date:
             revenue_queryset = revenue_queryset.filter(created_at__gte=start_date)
         if end_date:
-            revenue_queryset = revenue_queryset.filter(created_at__lte=end_date)
-
-        # Update any pending revenue that's now available (past 7-day holding period)
-        OrganizerRevenue.objects.filter(
-            status='pending',
-            available_at__lte=now
-        ).update(status='available')
-
-        # Available balance (ready to withdraw)
-        available_balance = revenue_queryset.filter(
-            status='available',
-            is_withdrawn=False
-        ).aggregate(total=Sum('organizer_earnings'))['total'] or Decimal('0')
-
-        # Pending balance (still in 7-day holding period)
-        pending_balance = revenue_queryset.filter(
-            status='pending'
-        ).aggregate(total=Sum('organizer_earnings'))['total'] or Decimal('0')
-
-        # Total paid out (already withdrawn)
-        total_paid_out = revenue_queryset.filter(
-            is_withdrawn=True
-        ).aggregate(total=Sum('organizer_earnings'))['total'] or Decimal('0')
+            revenue_queryset = revenue_queryset.filter(created_at__lt=end_date)
+
+        # Available (ready to withdraw), pending (7-day hold) and withdrawn
+        # balances via conditional aggregation in a single query. Pending rows
+        # past available_at count as available until release_pending_revenue
+        # flips their status, so this endpoint stays read-only.
+        released = Q(status='available') | Q(status='pending', available_at__lte=now)
+        balances = revenue_queryset.aggregate(
+            available=Sum('organizer_earnings', filter=released & Q(is_withdrawn=False)),
+            pending=Sum('organizer_earnings', filter=Q(status='pending', available_at__gt=now)),
+            paid_out=Sum('organizer_earnings', filter=Q(is_withdrawn=True))
+        )
+        available_balance = balances['available'] or Decimal('0')
+        pending_balance = balances['pending'] or Decimal('0')
+        total_paid_out = balances['paid_out'] or Decimal('0')
         
         # Calculate next payout date (mock: 15th of next month)
-        from datetime import timedelta
-        if now.day < 15:
-            next_payout_date = now.replace(day=15).date()
-        else:
-            next_month = now.replace(day=1) + timedelta(days=32)
-            next_payout_date = next_month.replace(day=15).date()
+        next_payout_date = _next_payout_date(now.date())
+
+        # Revenue by event (fee split computed in SQL)
+        money = DecimalField(max_digits=12, decimal_places=2)
+        fee_split = {
+            'gross_revenue': Sum('subtotal'),
+            'platform_fee': ExpressionWrapper(Sum('subtotal') * _FEE_RATE, output_field=money),
+            'net_revenue': ExpressionWrapper(Sum('subtotal') * _NET_RATE, output_field=money),
+            'tickets_sold': Sum('paid_tickets'),
+        }
 
-        # Revenue by event
         revenue_by_event = []
-        event_revenue = purchases_query.values(
+        event_revenue = purchases_query.annotate(
+            paid_tickets=_paid_tickets_subquery()
+        ).values(
             'event__id',
             'event__title'
-        ).annotate(
-            gross_revenue=Sum('subtotal'),
-            tickets_sold=Count('tickets', filter=Q(tickets__status='paid'))
-        ).order_by('-gross_revenue')[:10]  # Top 10 events
+        ).annotate(**fee_split).order_by('-gross_revenue')[:10]  # Top 10 events
 
         for event_data in event_revenue:
-            event_gross = event_data['gross_revenue'] or Decimal('0')
-            event_platform_fee = event_gross * (platform_fee_percentage / Decimal('100'))
-            event_net = event_gross - event_platform_fee
-            
             revenue_by_event.append({
                 'event_id': event_data['event__id'],
                 'event_title': event_data['event__title'],
-                'gross_revenue': str(event_gross),
-                'net_revenue': str(event_net),
-                'platform_fee': str(event_platform_fee),
-                'tickets_sold': event_data['tickets_sold']
+                'gross_revenue': str(event_data['gross_revenue'] or Decimal('0')),
+                'net_revenue': str(event_data['net_revenue'] or Decimal('0')),
+                'platform_fee': str(event_data['platform_fee'] or Decimal('0')),
+                'tickets_sold': event_data['tickets_sold'] or 0
             })
 
-        # Revenue by month (last 12 months)
-        from django.db.models.functions import TruncMonth
-        from datetime import timedelta
-        
-        twelve_months_ago = now - timedelta(days=365)
-        revenue_by_month = []
-        
+        # Revenue by month (last 12 calendar months, gapless, newest first)
+
+        months = []
+        year, month = now.year, now.month
+        for _ in range(12):
+            months.append((year, month))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        oldest_year, oldest_month = months[-1]
+        twelve_months_ago = now.replace(
+            year=oldest_year, month=oldest_month, day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+
         monthly_revenue = Purchase.objects.filter(
             event__organizer=user,
             status='completed',
             created_at__gte=twelve_months_ago
         ).annotate(
-            month=TruncMonth('created_at')
-        ).values('month').annotate(
-            gross_revenue=Sum('subtotal'),
-            tickets_sold=Count('tickets', filter=Q(tickets__status='paid'))
-        ).order_by('-month')
+            month=TruncMonth('created_at'),
+            paid_tickets=_paid_tickets_subquery()
+        ).values('month').annotate(**fee_split)
+        revenue_per_month = {
+            (row['month'].year, row['month'].month): row for row in monthly_revenue
+        }
 
-        for month_data in monthly_revenue:
-            month_gross = month_data['gross_revenue'] or Decimal('0')
-            month_platform_fee = month_gross * (platform_fee_percentage / Decimal('100'))
-            month_net = month_gross - month_platform_fee
-            
+        revenue_by_month = []
+        for year, month in months:
+            month_data = revenue_per_month.get((year, month), {})
             revenue_by_month.append({
-                'month': month_data['month'].strftime('%Y-%m'),
-                'gross_revenue': str(month_gross),
-                'net_revenue': str(month_net),
-                'platform_fee': str(month_platform_fee),
-                'tickets_sold': month_data['tickets_sold']
+                'month': f'{year:04d}-{month:02d}',
+                'gross_revenue': str(month_data.get('gross_revenue') or Decimal('0')),
+                'net_revenue': str(month_data.get('net_revenue') or Decimal('0')),
+                'platform_fee': str(month_data.get('platform_fee') or Decimal('0')),
+                'tickets_sold': month_data.get('tickets_sold') or 0
             })
 
         # Recent transactions (last 20)
-        recent_purchases = purchases_query.select_related(
-            'event',
-            'user'
-        ).prefetch_related('tickets__ticket_type').order_by('-created_at')[:20]
+        # Only the columns read below; the user join was unused
+        recent_purchases = purchases_query.select_related('event').only(
+            'id', 'created_at', 'subtotal', 'event', 'event__id', 'event__title'
+        ).prefetch_related(
+            Prefetch(
+                'tickets',
+                queryset=Ticket.objects.select_related('ticket_type').only(
+                    'id', 'purchase', 'ticket_type', 'ticket_type__name'
+                ).order_by('id')
+            )
+        ).annotate(
+            transaction_fee=ExpressionWrapper(F('subtotal') * _FEE_RATE, output_field=money),
+            transaction_net=ExpressionWrapper(F('subtotal') * _NET_RATE, output_field=money)
+        ).order_by('-created_at')[:20]
 
         recent_transactions = []
         for purchase in recent_purchases:
-            first_ticket = purchase.tickets.first()
+            # .all() reads the prefetch cache; .first() would query again
+            purchase_tickets = purchase.tickets.all()
+            first_ticket = purchase_tickets[0] if purchase_tickets else None
             if first_ticket:
-                ticket_price = purchase.subtotal
-                transaction_platform_fee = ticket_price * (platform_fee_percentage / Decimal('100'))
-                transaction_net = ticket_price - transaction_platform_fee
-                
                 recent_transactions.append({
                     'date': purchase.created_at.isoformat(),
                     'event_title': purchase.event.title,
                     'ticket_type': first_ticket.ticket_type.name if first_ticket.ticket_type else 'N/A',
-                    'amount': str(ticket_price),
-                    'platform_fee': str(transaction_platform_fee),
-                    'net_amount': str(transaction_net)
+                    'amount': str(purchase.subtotal),
+                    'platform_fee': str(purchase.transaction_fee),
+                    'net_amount': str(purchase.transaction_net)
                 })
 
-        return Response({
+        revenue = {
             'period': period,
             'summary': {
                 'gross_revenue': str(gross_revenue),
@@ -1041,6 +1230,9 @@ class OrganizerRevenueView(APIView):
             'revenue_by_event': revenue_by_event,
             'revenue_by_month': revenue_by_month,
             'recent_transactions': recent_transactions
-        })
+        }
+        cache.set(cache_key, revenue, DASHBOARD_CACHE_TIMEOUT)
+
+        return Response(revenue)
 
 
@@ -2,7 +2,9 @@
 Tickets App URL Configuration
 Matches the API specification from documentation
 """
-from django.urls import path
+from django.urls import path, register_converter
+
+from .converters import SlugOrIdConverter
 
 # Event Views
 from .event_views import (
@@ -56,6 +58,8 @@ from .contact_views import (
 # Payment Views
 from .payment_views import initiate_payment, verify_payment
 
+register_converter(SlugOrIdConverter, 'sid')
+
 urlpatterns = [
     # ============================================================================
     # EVENT CATEGORIES
@@ -70,25 +74,25 @@ urlpatterns = [
 
     # Event Creation & Management (must come before <slug> to avoid conflicts)
     path('events/create/', EventCreateView.as_view(), name='event-create'),
-    path('events/<str:slug_or_id>/delete/', DeleteEventView.as_view(), name='delete-event'),
+    path('events/<sid:slug_or_id>/delete/', DeleteEventView.as_view(), name='delete-event'),
     path('events/my-events/', MyEventsView.as_view(), name='my-events'),
-    path('events/my-events/<str:slug_or_id>/', MyEventDetailView.as_view(), name='my-event-detail'),
-    path('events/my-events/<str:slug_or_id>/analytics/', EventAnalyticsView.as_view(), name='my-event-analytics'),
+    path('events/my-events/<sid:slug_or_id>/', MyEventDetailView.as_view(), name='my-event-detail'),
+    path('events/my-events/<sid:slug_or_id>/analytics/', EventAnalyticsView.as_view(), name='my-event-analytics'),
 
     # Event Detail (must come after specific paths to avoid slug conflicts)
     path('events/<slug:slug>/', EventDetailView.as_view(), name='event-detail'),
-    path('events/<str:slug_or_id>/update/', EventUpdateView.as_view(), name='event-update'),
+    path('events/<sid:slug_or_id>/update/', EventUpdateView.as_view(), name='event-update'),
 
     # Event Analytics & Attendees (Organizer) - Changed to support slug or ID
-    path('events/<str:slug_or_id>/analytics/', EventAnalyticsView.as_view(), name='event-analytics'),
-    path('events/<str:slug_or_id>/attendees/', EventAttendeesView.as_view(), name='event-attendees'),
-    path('events/<str:slug_or_id>/checkin/', CheckInTicketView.as_view(), name='event-checkin'),
-    path('events/<str:slug_or_id>/checkin-history/', CheckInHistoryView.as_view(), name='checkin-history'),
+    path('events/<sid:slug_or_id>/analytics/', EventAnalyticsView.as_view(), name='event-analytics'),
+    path('events/<sid:slug_or_id>/attendees/', EventAttendeesView.as_view(), name='event-attendees'),
+    path('events/<sid:slug_or_id>/checkin/', CheckInTicketView.as_view(), name='event-checkin'),
+    path('events/<sid:slug_or_id>/checkin-history/', CheckInHistoryView.as_view(), name='checkin-history'),
 
     # Ticket Types
-    path('events/<str:slug_or_id>/tickets/', CreateTicketTypeView.as_view(), name='create-ticket-type'),
-    path('events/<str:slug_or_id>/tickets/<int:ticket_id>/', UpdateTicketTypeView.as_view(), name='update-ticket-type'),
-    path('events/<str:slug_or_id>/tickets/<int:ticket_id>/delete/', DeleteTicketTypeView.as_view(), name='delete-ticket-type'),
+    path('events/<sid:slug_or_id>/tickets/', CreateTicketTypeView.as_view(), name='create-ticket-type'),
+    path('events/<sid:slug_or_id>/tickets/<int:ticket_id>/', UpdateTicketTypeView.as_view(), name='update-ticket-type'),
+    path('events/<sid:slug_or_id>/tickets/<int:ticket_id>/delete/', DeleteTicketTypeView.as_view(), name='delete-ticket-type'),
 
     # ============================================================================
     # TICKET PURCHASE
@@ -1,3 +1,9 @@
+"""
+Legacy router-era views
+Not mounted by tickets/urls.py (the live API lives in event_views,
+purchase_views, ticket_dashboard_views and payment_views), so this module
+is never imported at startup.
+"""
 from rest_framework import generics, status, viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAuthenticatedOrReadOnly
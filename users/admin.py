@@ -40,6 +40,7 @@ class PaymentProfileAdmin(admin.ModelAdmin):
         "verification_initiated_at",
         "verification_attempts",
         "last_verification_attempt",
+        "fee_percentage",
         "created_at",
         "updated_at",
     ]
@@ -0,0 +1,39 @@
+"""
+Django management command to verify payment profiles whose background
+verification never ran (e.g. the process restarted before the queued task)
+Run with: python manage.py verify_pending_payment_profiles
+Schedule every 10 minutes, e.g. cron: */10 * * * * python manage.py verify_pending_payment_profiles
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import PaymentProfile
+from users.tasks import verify_bank_account_task
+
+
+class Command(BaseCommand):
+    help = 'Verify pending payment profiles that have not had a verification attempt yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=10,
+            help='Only pick up profiles created at least this many minutes ago'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+        # No attempts yet means the queued task never ran; retries started
+        # through RetryVerificationView already count an attempt
+        profile_ids = list(PaymentProfile.objects.filter(
+            status='pending_verification',
+            verification_attempts=0,
+            created_at__lte=cutoff
+        ).values_list('id', flat=True))
+
+        for profile_id in profile_ids:
+            verify_bank_account_task(profile_id)
+
+        self.stdout.write(self.style.SUCCESS(f'Ran verification for {len(profile_ids)} payment profile(s)'))
@@ -1,21 +1,40 @@
+import logging
 import time
 
+from cafa_ticket.logging_handlers import queued_stream_handler
+
+logger = logging.getLogger("http.access")
+
+
+def _install_access_handler():
+    """Attach the queued access handler; its listener thread starts only when this middleware is enabled"""
+    if logger.handlers:
+        return
+    handler = queued_stream_handler()
+    handler.setFormatter(logging.Formatter("{levelname} {message}", style="{"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
 
 class LoggerMiddleware:
+    __slots__ = ("get_response",)
+
     def __init__(self, get_response):
         self.get_response = get_response
+        _install_access_handler()
 
     def __call__(self, request):
-        start_time = time.time()
-        response = self.get_response(request)
-        duration = time.time() - start_time
+        if not logger.isEnabledFor(logging.INFO):
+            return self.get_response(request)
 
-        method = request.method
-        path = request.get_full_path()
-        status_code = response.status_code
+        start_time = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start_time
 
-        print(
-            f"{method} {path} {status_code} - {duration:.4f} seconds"
+        logger.info(
+            "%s %s %s - %.4f seconds",
+            request.method, request.get_full_path(), response.status_code, duration,
         )
 
-        return response
\ No newline at end of file
+        return response
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+def populate_account_identifier(apps, schema_editor):
+    PaymentProfile = apps.get_model('users', 'PaymentProfile')
+    profiles = list(PaymentProfile.objects.only('id', 'account_details'))
+    for profile in profiles:
+        details = profile.account_details or {}
+        profile.account_identifier = details.get('mobile_number') or details.get('account_number', '')
+    PaymentProfile.objects.bulk_update(profiles, ['account_identifier'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_paymentprofile_verification_charge_reference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentprofile',
+            name='account_identifier',
+            field=models.CharField(blank=True, help_text='Mobile number or bank account number (copied from account_details)', max_length=50),
+        ),
+        migrations.RunPython(populate_account_identifier, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='paymentprofile',
+            index=models.Index(fields=['user', 'method', 'account_identifier'], name='idx_payment_profile_account'),
+        ),
+    ]
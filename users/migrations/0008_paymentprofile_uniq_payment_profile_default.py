@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+def clear_extra_defaults(apps, schema_editor):
+    # Keep the most recently created default per user
+    PaymentProfile = apps.get_model('users', 'PaymentProfile')
+    seen = set()
+    extra = []
+    for profile_id, user_id in (
+        PaymentProfile.objects.filter(is_default=True)
+        .order_by('user_id', '-created_at')
+        .values_list('id', 'user_id')
+    ):
+        if user_id in seen:
+            extra.append(profile_id)
+        seen.add(user_id)
+    PaymentProfile.objects.filter(id__in=extra).update(is_default=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_alter_paymentprofile_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_extra_defaults, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='paymentprofile',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('user',), name='uniq_payment_profile_default'),
+        ),
+    ]
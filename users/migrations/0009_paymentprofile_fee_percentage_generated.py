@@ -0,0 +1,24 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_paymentprofile_uniq_payment_profile_default'),
+    ]
+
+    # A stored column cannot be altered into a generated one in place; the
+    # value is a pure function of method, so dropping and re-adding loses nothing
+    operations = [
+        migrations.RemoveField(
+            model_name='paymentprofile',
+            name='fee_percentage',
+        ),
+        migrations.AddField(
+            model_name='paymentprofile',
+            name='fee_percentage',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(method='mobile_money', then=models.Value(Decimal('1.50'))), models.When(method='bank_transfer', then=models.Value(Decimal('2.00'))), default=models.Value(Decimal('1.50'))), help_text='Transaction fee percentage for this payment method', output_field=models.DecimalField(decimal_places=2, max_digits=4)),
+        ),
+    ]
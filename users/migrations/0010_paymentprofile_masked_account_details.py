@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+def mask_account_details(method, account_details):
+    # Frozen copy of users.models.mask_account_details as of this migration
+    details = account_details.copy()
+
+    if method == "mobile_money" and "mobile_number" in details:
+        number = details["mobile_number"]
+        if len(number) > 7:
+            details["mobile_number"] = number[:4] + "***" + number[-4:]
+
+    if method == "bank_transfer" and "account_number" in details:
+        account = details["account_number"]
+        if len(account) > 6:
+            details["account_number"] = "******" + account[-4:]
+
+    return details
+
+
+def populate_masked_account_details(apps, schema_editor):
+    PaymentProfile = apps.get_model('users', 'PaymentProfile')
+    profiles = list(PaymentProfile.objects.only('id', 'method', 'account_details'))
+    for profile in profiles:
+        profile.masked_account_details = mask_account_details(profile.method, profile.account_details or {})
+    PaymentProfile.objects.bulk_update(profiles, ['masked_account_details'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_paymentprofile_fee_percentage_generated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentprofile',
+            name='masked_account_details',
+            field=models.JSONField(blank=True, editable=False, help_text='account_details with the number masked, for list responses', null=True),
+        ),
+        migrations.RunPython(populate_masked_account_details, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,46 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.core.validators import RegexValidator
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
 from .managers import UserManager
 
 
+def _scalar_subquery(queryset, group_by, aggregate, output_field):
+    """Correlated subquery returning one aggregate for the outer row (0 if none)"""
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_by).annotate(value=aggregate).values('value'),
+            output_field=output_field,
+        ),
+        0,
+        output_field=output_field,
+    )
+
+
+def mask_account_details(method, account_details):
+    """Copy of a payment profile's account details with the number masked"""
+    details = account_details.copy()
+
+    if method == "mobile_money" and "mobile_number" in details:
+        number = details["mobile_number"]
+        if len(number) > 7:
+            details["mobile_number"] = number[:4] + "***" + number[-4:]
+
+    if method == "bank_transfer" and "account_number" in details:
+        account = details["account_number"]
+        if len(account) > 6:
+            details["account_number"] = "******" + account[-4:]
+
+    return details
+
+
 class User(AbstractUser):
     email = models.EmailField(
         unique=True, db_index=True, help_text="Email address used for login"
@@ -185,12 +220,10 @@ class User(AbstractUser):
 
     def save(self, *args, **kwargs):
         if self.pk:
-            try:
-                old_user = User.objects.get(pk=self.pk)
-                if old_user.username != self.username:
-                    self.username_last_changed = timezone.now()
-            except User.DoesNotExist:
-                pass
+            # Only the stored username is needed, not the whole row
+            old_username = User.objects.filter(pk=self.pk).values_list('username', flat=True).first()
+            if old_username is not None and old_username != self.username:
+                self.username_last_changed = timezone.now()
 
         super().save(*args, **kwargs)
 
@@ -198,24 +231,28 @@ class User(AbstractUser):
         """Return user statistics"""
         from tickets.models import Ticket, Event, Purchase
 
-        tickets_purchased = Ticket.objects.filter(
-            purchase__user=self,
-            purchase__status="completed"
-        ).count()
-
-        events_organized = Event.objects.filter(organizer=self).count()
-
-        from django.db.models import Sum
-        total_spent = Purchase.objects.filter(
-            user=self,
-            status="completed"
-        ).aggregate(total=Sum("total"))["total"] or 0
+        # Three correlated subqueries in one round trip; joining the tables
+        # directly would multiply rows and inflate the spend total
+        totals = User.objects.filter(pk=self.pk).annotate(
+            tickets_purchased=_scalar_subquery(
+                Ticket.objects.filter(purchase__user=OuterRef('pk'), purchase__status="completed"),
+                'purchase__user', Count('pk'), models.IntegerField(),
+            ),
+            events_organized=_scalar_subquery(
+                Event.objects.filter(organizer=OuterRef('pk')),
+                'organizer', Count('pk'), models.IntegerField(),
+            ),
+            total_spent=_scalar_subquery(
+                Purchase.objects.filter(user=OuterRef('pk'), status="completed"),
+                'user', Sum('total'), models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+        ).values('tickets_purchased', 'events_organized', 'total_spent').first() or {}
 
         return {
-            "total_tickets_purchased": tickets_purchased,
+            "total_tickets_purchased": totals.get('tickets_purchased', 0),
             "total_events_attended": 0,  # TODO: Based on checked-in tickets
-            "events_organized": events_organized,
-            "total_spent": float(total_spent),
+            "events_organized": totals.get('events_organized', 0),
+            "total_spent": float(totals.get('total_spent') or 0),
             "account_age_days": (timezone.now() - self.date_joined).days,
         }
 
@@ -234,7 +271,7 @@ class PaymentProfile(models.Model):
         ("verification_failed", "Verification Failed"),
     ]
 
-    id = models.UUIDField(primary_key=True, default=None, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -258,10 +295,15 @@ class PaymentProfile(models.Model):
     account_details = models.JSONField(
         help_text="Account details (mobile number, account number, etc.)"
     )
-    fee_percentage = models.DecimalField(
-        max_digits=4,
-        decimal_places=2,
-        default=1.5,
+    # Computed by the database from method on every write
+    fee_percentage = models.GeneratedField(
+        expression=models.Case(
+            models.When(method="mobile_money", then=models.Value(Decimal("1.50"))),
+            models.When(method="bank_transfer", then=models.Value(Decimal("2.00"))),
+            default=models.Value(Decimal("1.50")),
+        ),
+        output_field=models.DecimalField(max_digits=4, decimal_places=2),
+        db_persist=True,
         help_text="Transaction fee percentage for this payment method"
     )
     status = models.CharField(
@@ -319,6 +361,19 @@ class PaymentProfile(models.Model):
         help_text="Paystack charge reference for GHS 1 verification"
     )
 
+    # Denormalized from account_details so duplicate checks can use an index
+    account_identifier = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Mobile number or bank account number (copied from account_details)"
+    )
+    masked_account_details = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="account_details with the number masked, for list responses"
+    )
+
     class Meta:
         ordering = ["-is_default", "-created_at"]
         verbose_name = "Payment Profile"
@@ -327,29 +382,63 @@ class PaymentProfile(models.Model):
             models.Index(fields=["user"], name="idx_payment_profile_user"),
             models.Index(fields=["status"], name="idx_payment_profile_status"),
             models.Index(fields=["is_verified"], name="idx_payment_profile_verified"),
+            models.Index(fields=["user", "method", "account_identifier"], name="idx_payment_profile_account"),
+        ]
+        constraints = [
+            # At most one default per user; also serves default-profile lookups
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(is_default=True),
+                name="uniq_payment_profile_default",
+            ),
         ]
 
     def __str__(self):
         return f"{self.user.email} - {self.name}"
 
-    def save(self, *args, **kwargs):
-        import uuid
-        if not self.id:
-            self.id = uuid.uuid4()
-
-        # Set fee percentage based on method
-        if self.method == "mobile_money":
-            self.fee_percentage = 1.5
-        elif self.method == "bank_transfer":
-            self.fee_percentage = 2.0
-
-        # If this is set as default, unset other defaults
-        if self.is_default:
-            PaymentProfile.objects.filter(user=self.user, is_default=True).exclude(
-                id=self.id
-            ).update(is_default=False)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values save() needs to detect transitions
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values)
+            if name == 'is_default'
+        }
+        return instance
 
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.apply_derived_fields()
+
+        # If this is newly set as default, unset the old default first; the
+        # partial unique constraint rejects two defaults, so swap atomically
+        # _loaded_values is set per instance by from_db() and after each save
+        loaded = getattr(self, '_loaded_values', {})
+        if self.is_default and (adding or not loaded.get('is_default')):
+            with transaction.atomic():
+                PaymentProfile.objects.filter(user_id=self.user_id, is_default=True).exclude(
+                    id=self.id
+                ).update(is_default=False)
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._loaded_values = {'is_default': self.is_default}
+        cache.delete(self.status_cache_key(self.id, self.user_id))
+
+    def apply_derived_fields(self):
+        """Fill the columns computed from account_details"""
+        details = self.account_details or {}
+        self.account_identifier = details.get('mobile_number') or details.get('account_number', '')
+        self.masked_account_details = mask_account_details(self.method, details)
+
+    def delete(self, *args, **kwargs):
+        cache.delete(self.status_cache_key(self.id, self.user_id))
+        return super().delete(*args, **kwargs)
+
+    @staticmethod
+    def status_cache_key(profile_id, user_id):
+        """Cache key for a profile's polled verification-status payload"""
+        return f"pp:status:{profile_id}:{user_id}"
 
     @property
     def account_number(self):
@@ -376,17 +465,7 @@ class PaymentProfile(models.Model):
         return self.account_details.get('bank_name', '')
 
     def get_masked_account_details(self):
-        """Return masked account details for security"""
-        details = self.account_details.copy()
-
-        if self.method == "mobile_money" and "mobile_number" in details:
-            number = details["mobile_number"]
-            if len(number) > 7:
-                details["mobile_number"] = number[:4] + "***" + number[-4:]
-
-        if self.method == "bank_transfer" and "account_number" in details:
-            account = details["account_number"]
-            if len(account) > 6:
-                details["account_number"] = "******" + account[-4:]
-
-        return details
+        """Return masked account details for security (stored on save)"""
+        if self.masked_account_details is None:
+            self.masked_account_details = mask_account_details(self.method, self.account_details)
+        return self.masked_account_details
@@ -2,10 +2,15 @@
 Payment Profile Serializers
 Matches the API specification for payment profile management
 """
+import re
+
 from rest_framework import serializers
 from .models import PaymentProfile, User
 from django.utils import timezone
 
+# Ghanaian mobile numbers: +233 followed by 9 digits
+GHANA_MOBILE_RE = re.compile(r'\+233[0-9]{9}')
+
 
 class PaymentProfileSerializer(serializers.ModelSerializer):
     """Serializer for payment profile list/detail views"""
@@ -36,10 +41,24 @@ class PaymentProfileSerializer(serializers.ModelSerializer):
         ]
 
     def get_account_details(self, obj):
-        """Return masked account details for security"""
+        """Return the masked account details stored on save"""
         return obj.get_masked_account_details()
 
 
+def _account_identifier(data):
+    """The (method, number) pair duplicate checks compare on"""
+    details = data['account_details']
+    if data['method'] == 'mobile_money':
+        return ('mobile_money', details['mobile_number'])
+    return ('bank_transfer', details['account_number'])
+
+
+DUPLICATE_ACCOUNT_MESSAGES = {
+    'mobile_money': 'This mobile money account is already registered.',
+    'bank_transfer': 'This bank account is already registered.',
+}
+
+
 class PaymentProfileCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating payment profiles"""
 
@@ -77,9 +96,8 @@ class PaymentProfileCreateSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate_account_details(self, value):
-        """Validate account details based on payment method"""
-        method = self.initial_data.get('method')
+    def _validate_account_details(self, method, value):
+        """Validate account details based on the (already validated) payment method"""
 
         if method == 'mobile_money':
             # Validate mobile money details
@@ -98,7 +116,7 @@ class PaymentProfileCreateSerializer(serializers.ModelSerializer):
 
             # Validate mobile number format (Ghanaian format)
             mobile = value['mobile_number']
-            if not mobile.startswith('+233') or len(mobile) != 13:
+            if not GHANA_MOBILE_RE.fullmatch(mobile):
                 raise serializers.ValidationError(
                     "Invalid mobile number format. Must be in format: +233XXXXXXXXX"
                 )
@@ -134,30 +152,23 @@ class PaymentProfileCreateSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """Cross-field validation"""
+        # The required account details depend on the method
+        try:
+            self._validate_account_details(data['method'], data['account_details'])
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({'account_details': exc.detail})
+
         # Check for duplicate payment profile
         user = self.context['request'].user
-
-        if data['method'] == 'mobile_money':
-            mobile_number = data['account_details']['mobile_number']
-            if PaymentProfile.objects.filter(
-                user=user,
-                method='mobile_money',
-                account_details__mobile_number=mobile_number
-            ).exists():
-                raise serializers.ValidationError({
-                    'account_details': 'This mobile money account is already registered.'
-                })
-
-        elif data['method'] == 'bank_transfer':
-            account_number = data['account_details']['account_number']
-            if PaymentProfile.objects.filter(
-                user=user,
-                method='bank_transfer',
-                account_details__account_number=account_number
-            ).exists():
-                raise serializers.ValidationError({
-                    'account_details': 'This bank account is already registered.'
-                })
+        method, number = _account_identifier(data)
+        if PaymentProfile.objects.filter(
+            user=user,
+            method=method,
+            account_identifier=number
+        ).exists():
+            raise serializers.ValidationError({
+                'account_details': DUPLICATE_ACCOUNT_MESSAGES[method]
+            })
 
         return data
 
@@ -165,17 +176,15 @@ class PaymentProfileCreateSerializer(serializers.ModelSerializer):
         """Create payment profile and initiate verification"""
         user = self.context['request'].user
 
-        # Create payment profile
+        # Create payment profile with verification initiated (1 GHS deduction)
+        # in the same INSERT
         payment_profile = PaymentProfile.objects.create(
             user=user,
+            verification_initiated_at=timezone.now(),
+            status='pending_verification',
             **validated_data
         )
 
-        # Initiate verification (1 GHS deduction)
-        payment_profile.verification_initiated_at = timezone.now()
-        payment_profile.status = 'pending_verification'
-        payment_profile.save()
-
         # TODO: Integrate with Paystack to deduct 1 GHS for verification
         # For now, we'll mark it as pending
 
@@ -6,6 +6,7 @@ from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils import timezone
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 from datetime import timedelta
 
@@ -19,9 +20,17 @@ from .payment_serializers import (
 )
 
 from decimal import Decimal
+from django.db import transaction
 from django.db.models import Sum
+from tickets.cache import invalidate_dashboard_cache
 from tickets.models import OrganizerRevenue, WithdrawalRequest
 from .paystack_service import PaystackTransferService
+from .tasks import run_verification_in_background, verify_bank_account_task
+
+VERIFICATION_STATUS_CACHE_TIMEOUT = 30  # seconds
+RETRY_WINDOW_SECONDS = 60 * 60
+MAX_RETRIES_PER_WINDOW = 3
+
 
 class PaymentProfileListCreateView(generics.ListCreateAPIView):
     """
@@ -40,12 +49,14 @@ class PaymentProfileListCreateView(generics.ListCreateAPIView):
 
     def list(self, request, *args, **kwargs):
         """List all payment profiles for the user"""
-        queryset = self.get_queryset()
+        # The serializer reads the stored masked copy, so skip the raw JSON
+        queryset = self.get_queryset().defer('account_details')
         serializer = PaymentProfileSerializer(queryset, many=True)
+        results = serializer.data
 
         return Response({
-            'count': queryset.count(),
-            'results': serializer.data
+            'count': len(results),
+            'results': results
         })
 
     def create(self, request, *args, **kwargs):
@@ -54,60 +65,23 @@ class PaymentProfileListCreateView(generics.ListCreateAPIView):
         serializer.is_valid(raise_exception=True)
         payment_profile = serializer.save()
 
-        # 🔥 AUTOMATICALLY VERIFY BANK ACCOUNT WITH RETRY LOGIC
-        max_retries = 5
-        retry_count = 0
-        verification_result = None
-        
-        while retry_count < max_retries:
-            verification_result = PaystackTransferService.verify_bank_account(
-                payment_profile, 
-                is_retry=(retry_count > 0)
-            )
-            
-            if verification_result['success']:
-                # Verification successful
-                break
-            
-            if not verification_result.get('should_retry', False):
-                # No more retries needed (either succeeded or max attempts reached)
-                break
-            
-            retry_count += 1
-            
-            # Optional: Add a small delay between retries (0.5 seconds)
-            import time
-            time.sleep(0.5)
+        # 🔥 VERIFY BANK ACCOUNT IN THE BACKGROUND; clients poll the
+        # verification-status endpoint for the outcome
+        run_verification_in_background(verify_bank_account_task, payment_profile.pk)
 
-        # Return response with verification info
         response_serializer = PaymentProfileSerializer(payment_profile)
 
-        if verification_result and verification_result['success']:
-            return Response({
-                'success': True,
-                'message': 'Payment profile created and verified successfully.',
-                'data': {
-                    'payment_profile': response_serializer.data,
-                    'verification': {
-                        'status': 'verified',
-                        'attempts': payment_profile.verification_attempts,
-                        'resolved_name': verification_result.get('resolved_name')
-                    }
-                }
-            }, status=status.HTTP_201_CREATED)
-        else:
-            return Response({
-                'success': False,
-                'message': f'Payment profile created but verification failed after {payment_profile.verification_attempts} attempts.',
-                'data': {
-                    'payment_profile': response_serializer.data,
-                    'verification': {
-                        'status': payment_profile.status,
-                        'attempts': payment_profile.verification_attempts,
-                        'failure_reason': payment_profile.failure_reason
-                    }
+        return Response({
+            'success': True,
+            'message': 'Payment profile created. Verification is in progress.',
+            'data': {
+                'payment_profile': response_serializer.data,
+                'verification': {
+                    'status': payment_profile.status,
+                    'attempts': payment_profile.verification_attempts,
                 }
-            }, status=status.HTTP_201_CREATED)
+            }
+        }, status=status.HTTP_202_ACCEPTED)
 
 
 class PaymentProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -124,16 +98,12 @@ class PaymentProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
         return PaymentProfileSerializer
 
     def get_queryset(self):
-        return PaymentProfile.objects.filter(user=self.request.user)
+        return PaymentProfile.objects.select_related('user').filter(user=self.request.user)
 
     def get_object(self):
         """Get payment profile by ID"""
         profile_id = self.kwargs.get('pk')
-        return get_object_or_404(
-            PaymentProfile,
-            id=profile_id,
-            user=self.request.user
-        )
+        return get_object_or_404(self.get_queryset(), id=profile_id)
 
     def update(self, request, *args, **kwargs):
         """Update payment profile"""
@@ -160,20 +130,18 @@ class PaymentProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
                 'message': 'Cannot delete your default payment profile. Please set another profile as default first.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if profile is used by active events
-        active_events = instance.events.filter(
+        # Check if profile is used by active events (one query, two columns,
+        # streamed in chunks rather than cached on the queryset)
+        active_events = list(instance.events.filter(
             is_published=True,
             start_date__gte=timezone.now().date()
-        )
+        ).values('id', 'title').iterator(chunk_size=500))
 
-        if active_events.exists():
+        if active_events:
             return Response({
                 'error': 'Cannot delete payment profile',
-                'message': f'This payment profile is currently used by {active_events.count()} active events. Please update those events first.',
-                'active_events': [
-                    {'id': event.id, 'title': event.title}
-                    for event in active_events
-                ]
+                'message': f'This payment profile is currently used by {len(active_events)} active events. Please update those events first.',
+                'active_events': active_events
             }, status=status.HTTP_400_BAD_REQUEST)
 
         instance.delete()
@@ -189,7 +157,7 @@ class SetDefaultPaymentProfileView(APIView):
     def post(self, request, pk):
         """Set payment profile as default"""
         payment_profile = get_object_or_404(
-            PaymentProfile,
+            PaymentProfile.objects.select_related('user'),
             id=pk,
             user=request.user
         )
@@ -216,10 +184,20 @@ class VerificationStatusView(APIView):
 
     def get(self, request, pk):
         """Check verification status of payment profile"""
+        # Clients poll this while verification runs; PaymentProfile.save()
+        # drops the cached payload whenever the status changes
+        data = cache.get_or_set(
+            PaymentProfile.status_cache_key(pk, request.user.id),
+            lambda: self._build_status(pk, request.user),
+            VERIFICATION_STATUS_CACHE_TIMEOUT,
+        )
+        return Response(data)
+
+    def _build_status(self, pk, user):
         payment_profile = get_object_or_404(
-            PaymentProfile,
+            PaymentProfile.objects.select_related('user'),
             id=pk,
-            user=request.user
+            user=user
         )
 
         # Prepare response based on status
@@ -246,8 +224,7 @@ class VerificationStatusView(APIView):
                 'can_retry': True
             }
 
-        serializer = VerificationStatusSerializer(response_data)
-        return Response(serializer.data)
+        return dict(VerificationStatusSerializer(response_data).data)
 
 
 class RetryVerificationView(APIView):
@@ -259,7 +236,7 @@ class RetryVerificationView(APIView):
     def post(self, request, pk):
         """Retry verification for a failed payment profile"""
         payment_profile = get_object_or_404(
-            PaymentProfile,
+            PaymentProfile.objects.select_related('user'),
             id=pk,
             user=request.user
         )
@@ -283,12 +260,14 @@ class RetryVerificationView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         # Check rate limiting (max 3 attempts per hour)
+        now = timezone.now()
+        retry_window = timedelta(seconds=RETRY_WINDOW_SECONDS)
         if payment_profile.last_verification_attempt:
-            time_since_last_attempt = timezone.now() - payment_profile.last_verification_attempt
-            if time_since_last_attempt < timedelta(hours=1):
+            time_since_last_attempt = now - payment_profile.last_verification_attempt
+            if time_since_last_attempt < retry_window:
                 attempts_in_last_hour = payment_profile.verification_attempts
-                if attempts_in_last_hour >= 3:
-                    retry_after = int((timedelta(hours=1) - time_since_last_attempt).total_seconds())
+                if attempts_in_last_hour >= MAX_RETRIES_PER_WINDOW:
+                    retry_after = int((retry_window - time_since_last_attempt).total_seconds())
                     return Response({
                         'error': 'Rate limit exceeded',
                         'message': 'Too many verification attempts. Please try again in 1 hour.',
@@ -297,11 +276,14 @@ class RetryVerificationView(APIView):
 
         # Reset verification status
         payment_profile.status = 'pending_verification'
-        payment_profile.verification_initiated_at = timezone.now()
-        payment_profile.last_verification_attempt = timezone.now()
+        payment_profile.verification_initiated_at = now
+        payment_profile.last_verification_attempt = now
         payment_profile.verification_attempts += 1
         payment_profile.failure_reason = ''
-        payment_profile.save()
+        payment_profile.save(update_fields=[
+            'status', 'verification_initiated_at', 'last_verification_attempt',
+            'verification_attempts', 'failure_reason', 'updated_at',
+        ])
 
         # TODO: Integrate with Paystack to deduct 1 GHS for verification
 
@@ -312,6 +294,7 @@ class RetryVerificationView(APIView):
             'payment_profile': response_serializer.data
         })
 
+
 class CreateWithdrawalRequestView(APIView):
     """
     POST /api/v1/users/withdrawal/request/
@@ -342,6 +325,9 @@ class CreateWithdrawalRequestView(APIView):
                 'message': 'Minimum withdrawal amount is GHS 10.00'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        # Release any revenue past its holding period before checking balance
+        OrganizerRevenue.release_pending(organizer=user)
+
         # Check available balance
         available_balance = OrganizerRevenue.objects.filter(
             organizer=user,
@@ -465,25 +451,35 @@ class CreateWithdrawalRequestView(APIView):
     
     def _reserve_revenue(self, withdrawal, amount):
         """Reserve available revenue for this withdrawal"""
-        # Get available revenue items
-        available_revenue = OrganizerRevenue.objects.filter(
-            organizer=withdrawal.organizer,
-            status='available',
-            is_withdrawn=False,
-            withdrawal__isnull=True
-        ).order_by('created_at')
-        
-        # Reserve revenue items until we reach the requested amount
-        amount_reserved = Decimal('0.00')
-        for revenue_item in available_revenue:
-            if amount_reserved >= amount:
-                break
-            
-            revenue_item.withdrawal = withdrawal
-            revenue_item.status = 'on_hold'
-            revenue_item.save()
-            
-            amount_reserved += revenue_item.organizer_earnings
+        with transaction.atomic():
+            # Lock the organizer's available revenue so a concurrent
+            # withdrawal can't reserve the same rows
+            available_revenue = OrganizerRevenue.objects.select_for_update().filter(
+                organizer=withdrawal.organizer,
+                status='available',
+                is_withdrawn=False,
+                withdrawal__isnull=True
+            ).order_by('created_at').values_list('id', 'organizer_earnings')
+
+            # Pick revenue items until we reach the requested amount
+            reserved_ids = []
+            amount_reserved = Decimal('0.00')
+            for revenue_id, earnings in available_revenue:
+                if amount_reserved >= amount:
+                    break
+                reserved_ids.append(revenue_id)
+                amount_reserved += earnings
+
+            OrganizerRevenue.objects.filter(id__in=reserved_ids).update(
+                withdrawal=withdrawal,
+                status='on_hold',
+                updated_at=timezone.now()
+            )
+
+        # update() skips the post_save receiver that used to drop the cached
+        # revenue dashboard, so the reserved balance is invalidated here
+        if reserved_ids:
+            invalidate_dashboard_cache(withdrawal.organizer_id)
 
 
 class WithdrawalHistoryView(APIView):
@@ -536,7 +532,7 @@ class WithdrawalDetailView(APIView):
         user = request.user
         
         withdrawal = get_object_or_404(
-            WithdrawalRequest,
+            WithdrawalRequest.objects.select_related('payment_profile'),
             withdrawal_id=withdrawal_id,
             organizer=user
         )
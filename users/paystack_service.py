@@ -2,16 +2,15 @@
 Paystack Transfer Service
 Handles automated payouts to organizers
 """
-import requests
 from decimal import Decimal
-from django.conf import settings
 from django.utils import timezone
 import logging
 import uuid
 
+from tickets.utils import paystack_session, PAYSTACK_TIMEOUT
+
 logger = logging.getLogger(__name__)
 
-PAYSTACK_SECRET_KEY = settings.PAYSTACK_SECRET_KEY
 PAYSTACK_BASE_URL = "https://api.paystack.co"
 
 
@@ -32,11 +31,6 @@ class PaystackTransferService:
         """
         url = f"{PAYSTACK_BASE_URL}/transferrecipient"
         
-        headers = {
-            "Authorization": f"Bearer {PAYSTACK_SECRET_KEY}",
-            "Content-Type": "application/json"
-        }
-        
         # Handle both bank transfer and mobile money
         if payment_profile.method == 'bank_transfer':
             payload = {
@@ -62,7 +56,7 @@ class PaystackTransferService:
             }
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = paystack_session.post(url, json=payload, timeout=PAYSTACK_TIMEOUT)
             data = response.json()
             
             if response.status_code == 201 and data.get('status'):
@@ -120,11 +114,6 @@ class PaystackTransferService:
         # Initiate transfer
         url = f"{PAYSTACK_BASE_URL}/transfer"
         
-        headers = {
-            "Authorization": f"Bearer {PAYSTACK_SECRET_KEY}",
-            "Content-Type": "application/json"
-        }
-        
         # Convert to pesewas (GHS cents) - Paystack uses smallest currency unit
         amount_in_pesewas = int(withdrawal_request.final_amount * 100)
         
@@ -137,7 +126,7 @@ class PaystackTransferService:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = paystack_session.post(url, json=payload, timeout=PAYSTACK_TIMEOUT)
             data = response.json()
             
             if response.status_code == 200 and data.get('status'):
@@ -199,12 +188,8 @@ class PaystackTransferService:
         """
         url = f"{PAYSTACK_BASE_URL}/transfer/{transfer_code}"
         
-        headers = {
-            "Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"
-        }
-        
         try:
-            response = requests.get(url, headers=headers)
+            response = paystack_session.get(url, timeout=PAYSTACK_TIMEOUT)
             data = response.json()
             
             if response.status_code == 200 and data.get('status'):
@@ -240,17 +225,13 @@ class PaystackTransferService:
         """
         url = f"{PAYSTACK_BASE_URL}/bank/resolve"
         
-        headers = {
-            "Authorization": f"Bearer {PAYSTACK_SECRET_KEY}"
-        }
-        
         params = {
             "account_number": account_number,
             "bank_code": bank_code
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers)
+            response = paystack_session.get(url, params=params, timeout=PAYSTACK_TIMEOUT)
             data = response.json()
             
             if response.status_code == 200 and data.get('status'):
@@ -304,7 +285,7 @@ class PaystackTransferService:
             payment_profile.status = 'verified'
             payment_profile.is_verified = True
             payment_profile.verified_at = timezone.now()
-            payment_profile.save()
+            payment_profile.save(update_fields=['status', 'is_verified', 'verified_at', 'updated_at'])
             
             return {
                 'success': True,
@@ -322,6 +303,10 @@ class PaystackTransferService:
         
         payment_profile.verification_attempts += 1
         payment_profile.last_verification_attempt = timezone.now()
+        ATTEMPT_FIELDS = [
+            'status', 'failure_reason', 'verification_attempts',
+            'last_verification_attempt', 'updated_at',
+        ]
         
         # Resolve account number to verify it exists
         resolve_result = PaystackTransferService.resolve_account_number(
@@ -337,7 +322,7 @@ class PaystackTransferService:
                 # Still has attempts left - keep status as pending
                 payment_profile.status = 'pending_verification'
                 payment_profile.failure_reason = f"Attempt {payment_profile.verification_attempts}/{MAX_ATTEMPTS}: {resolve_result['message']}"
-                payment_profile.save()
+                payment_profile.save(update_fields=ATTEMPT_FIELDS)
                 
                 logger.warning(
                     f"Verification attempt {payment_profile.verification_attempts}/{MAX_ATTEMPTS} failed: "
@@ -355,7 +340,7 @@ class PaystackTransferService:
                 # Max attempts reached - mark as failed
                 payment_profile.status = 'verification_failed'
                 payment_profile.failure_reason = f"Failed after {MAX_ATTEMPTS} attempts: {resolve_result['message']}"
-                payment_profile.save()
+                payment_profile.save(update_fields=ATTEMPT_FIELDS)
                 
                 logger.error(
                     f"Verification failed after {MAX_ATTEMPTS} attempts: "
@@ -385,7 +370,10 @@ class PaystackTransferService:
         payment_profile.is_verified = True
         payment_profile.verified_at = timezone.now()
         payment_profile.verification_initiated_at = timezone.now()
-        payment_profile.save()
+        payment_profile.save(update_fields=[
+            'status', 'is_verified', 'verified_at', 'verification_initiated_at',
+            'verification_attempts', 'last_verification_attempt', 'updated_at',
+        ])
         
         reference = f"VER-{uuid.uuid4().hex[:12].upper()}"
         
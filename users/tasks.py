@@ -0,0 +1,39 @@
+"""
+Background tasks for the users app.
+
+Payment profile verification runs on its own worker pool, separate from the
+tickets app's email pool, so the external Paystack calls (and the pauses
+between retries) neither hold the request that created the profile nor
+delay ticket emails. Clients poll VerificationStatusView for the outcome.
+"""
+
+import time
+
+from cafa_ticket.background import BackgroundRunner
+
+from .models import PaymentProfile
+from .paystack_service import PaystackTransferService
+
+_verification_runner = BackgroundRunner("payment-verification")
+
+# Queue func(*args) on the verification pool after the current transaction commits
+run_verification_in_background = _verification_runner.submit
+
+MAX_VERIFICATION_ATTEMPTS = 5
+VERIFICATION_RETRY_DELAY = 0.5  # seconds
+
+
+def verify_bank_account_task(profile_id):
+    """Verify a payment profile, retrying while Paystack asks us to"""
+    payment_profile = PaymentProfile.objects.filter(pk=profile_id).first()
+    if payment_profile is None:
+        return
+
+    for attempt in range(MAX_VERIFICATION_ATTEMPTS):
+        result = PaystackTransferService.verify_bank_account(
+            payment_profile,
+            is_retry=attempt > 0
+        )
+        if result['success'] or not result.get('should_retry', False):
+            return
+        time.sleep(VERIFICATION_RETRY_DELAY)
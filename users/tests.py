@@ -1,3 +1,157 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tickets.models import OrganizerRevenue, TicketType, WithdrawalRequest
+from tickets.tests import make_event, make_purchase, make_revenue
+from .models import PaymentProfile, User
+from .payment_views import CreateWithdrawalRequestView
+
+
+class PaymentProfileDefaultTests(TestCase):
+    """At most one default profile per user, swapped in PaymentProfile.save()"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('ama', 'ama@example.com', 'pass12345')
+
+    def _profile(self, number, user=None, **kwargs):
+        return PaymentProfile.objects.create(
+            user=user or self.user,
+            method='mobile_money',
+            name=f'MoMo {number}',
+            account_details={
+                'mobile_number': f'+233{number}',
+                'network': 'MTN',
+                'account_name': 'Ama Mensah',
+            },
+            **kwargs
+        )
+
+    def _defaults(self, user=None):
+        return list(PaymentProfile.objects.filter(
+            user=user or self.user, is_default=True
+        ).values_list('id', flat=True))
+
+    def test_new_default_replaces_old_default(self):
+        first = self._profile('241234567', is_default=True)
+        second = self._profile('241234568', is_default=True)
+
+        first.refresh_from_db()
+        self.assertFalse(first.is_default)
+        self.assertEqual(self._defaults(), [second.id])
+
+    def test_promoting_loaded_profile_replaces_old_default(self):
+        first = self._profile('241234567', is_default=True)
+        second = self._profile('241234568')
+
+        second = PaymentProfile.objects.get(pk=second.pk)
+        second.is_default = True
+        second.save()
+
+        self.assertEqual(self._defaults(), [second.id])
+
+    def test_resaving_current_default_keeps_it(self):
+        first = self._profile('241234567', is_default=True)
+        self._profile('241234568')
+
+        first = PaymentProfile.objects.get(pk=first.pk)
+        first.name = 'Main MoMo'
+        first.save()
+
+        self.assertEqual(self._defaults(), [first.id])
+
+    def test_other_users_defaults_are_untouched(self):
+        other = User.objects.create_user('kofi', 'kofi@example.com', 'pass12345')
+        theirs = self._profile('241234569', user=other, is_default=True)
+
+        self._profile('241234567', is_default=True)
+
+        self.assertEqual(self._defaults(other), [theirs.id])
+
+    def test_constraint_rejects_second_default_written_around_save(self):
+        self._profile('241234567', is_default=True)
+        second = self._profile('241234568')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PaymentProfile.objects.filter(pk=second.pk).update(is_default=True)
+
+
+class ReserveRevenueTests(TestCase):
+    """Withdrawals reserve the oldest available revenue in one UPDATE"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user('ama', 'ama@example.com', 'pass12345')
+        buyer = User.objects.create_user('kofi', 'kofi@example.com', 'pass12345')
+        ticket_type = TicketType.objects.create(
+            event=make_event(self.organizer), name='Regular', price=Decimal('50.00'), quantity=10
+        )
+        purchase = make_purchase(buyer, ticket_type, 1)
+
+        now = timezone.now()
+        self.revenue = []
+        for age, earnings in ((3, '60.00'), (2, '50.00'), (1, '40.00')):
+            record = make_revenue(purchase, Decimal(earnings), status='available')
+            OrganizerRevenue.objects.filter(pk=record.pk).update(created_at=now - timedelta(days=age))
+            self.revenue.append(record)
+        self.not_yet_due = make_revenue(
+            purchase, Decimal('80.00'), status='pending', available_at=now + timedelta(days=3)
+        )
+
+        profile = PaymentProfile.objects.create(
+            user=self.organizer,
+            method='mobile_money',
+            name='MoMo',
+            account_details={
+                'mobile_number': '+233241234567',
+                'network': 'MTN',
+                'account_name': 'Ama Mensah',
+            },
+        )
+        self.withdrawal = WithdrawalRequest.objects.create(
+            organizer=self.organizer,
+            payment_profile=profile,
+            requested_amount=Decimal('100.00'),
+        )
+
+    def _reserve(self, amount='100.00'):
+        CreateWithdrawalRequestView()._reserve_revenue(self.withdrawal, Decimal(amount))
+
+    def test_reserves_oldest_rows_until_amount_is_covered(self):
+        self._reserve()
+
+        oldest, middle, newest = (OrganizerRevenue.objects.get(pk=r.pk) for r in self.revenue)
+        for record in (oldest, middle):
+            self.assertEqual(record.status, 'on_hold')
+            self.assertEqual(record.withdrawal_id, self.withdrawal.pk)
+        self.assertEqual(newest.status, 'available')
+        self.assertIsNone(newest.withdrawal_id)
+        self.not_yet_due.refresh_from_db()
+        self.assertEqual(self.not_yet_due.status, 'pending')
+
+    def test_reserved_rows_are_not_reserved_twice(self):
+        self._reserve()
+        self._reserve('40.00')
+
+        self.assertEqual(
+            OrganizerRevenue.objects.filter(withdrawal=self.withdrawal).count(), 3
+        )
+        self.assertFalse(OrganizerRevenue.objects.filter(status='available').exists())
+
+    def test_revenue_dashboard_reflects_reservation(self):
+        client = APIClient()
+        client.force_authenticate(self.organizer)
+        url = reverse('organizer-revenue')
+
+        before = client.get(url).data['payout_status']['available_balance']
+        self._reserve()
+        after = client.get(url).data['payout_status']['available_balance']
 
-# Create your tests here.
+        # The UPDATE skips the revenue post_save receiver, so a dashboard
+        # cached just before the reservation must still be invalidated
+        self.assertEqual(Decimal(before), Decimal('150.00'))
+        self.assertEqual(Decimal(after), Decimal('40.00'))